@@ -1,14 +1,50 @@
 import os
+import sys
 import requests
+from requests.adapters import HTTPAdapter
+from modules.http_utils import POST_SAFE_RETRY
 import json
+try:
+    # orjson parses the raw response bytes in C; fall back to the stdlib if absent.
+    import orjson
+    json_loads = orjson.loads
+    json_dumps = orjson.dumps
+except ImportError:
+    json_loads = json.loads
+    json_dumps = lambda obj: json.dumps(obj).encode("utf-8")
 from dotenv import load_dotenv
 from datetime import datetime, timedelta, timezone
-from dateutil.parser import parse
 
 # Load env variables for the module
 load_dotenv()
 BUTTONDOWN_API_KEY = os.getenv("BUTTONDOWN_API_KEY")
 BUTTONDOWN_EDIT = os.getenv("BUTTONDOWN_EDIT")
+BUTTONDOWN_BASE_URL = "https://api.buttondown.email"
+BUTTONDOWN_ENDPOINT = "/emails"
+
+# One pooled session for every Buttondown call so repeat requests reuse the
+# same TCP+TLS connection.
+SESSION = requests.Session()
+SESSION.mount("https://", HTTPAdapter(
+    pool_connections=4,
+    pool_maxsize=4,
+    max_retries=POST_SAFE_RETRY, # Retries POSTs too, but only when a re-send can't double-post
+))
+SESSION.headers.update({"Authorization": f"Token {BUTTONDOWN_API_KEY}"})
+
+# Buttondown timestamps look like '2024-01-15T10:00:00Z'. Python 3.11+ parses the
+# trailing 'Z' natively, so the version check happens once here, not per email.
+if sys.version_info >= (3, 11):
+    parse_publish_date = datetime.fromisoformat
+else:
+    def parse_publish_date(value):
+        return datetime.fromisoformat(value.replace('Z', '+00:00'))
+
+WEEKDAY_ABBR = ('Mon', 'Tue', 'Wed', 'Thu', 'Fri', 'Sat', 'Sun')
+
+def format_publish_date(value):
+    """Formats a Buttondown timestamp as 'YYYY-MM-DD (Day)' for the selection menu."""
+    return f"{value[:10]} ({WEEKDAY_ABBR[parse_publish_date(value).weekday()]})"
 
 
 # This function takes a subject and body content as input, and then sends a POST request
@@ -23,14 +59,14 @@ def post_to_buttondown(subject, body_content):
         print("❌ BUTTONDOWN_API_KEY not found.")
         return
 
-    headers = {"Authorization": f"Token {BUTTONDOWN_API_KEY}", "Content-Type": "application/json"}
-    url = "https://api.buttondown.email/v1/emails"
+    headers = {"Content-Type": "application/json"}
+    url = f"{BUTTONDOWN_BASE_URL}/v1{BUTTONDOWN_ENDPOINT}"
     editor_mode_comment = f"{BUTTONDOWN_EDIT}" if BUTTONDOWN_EDIT else ""
     final_body = f"{editor_mode_comment}\n{body_content}"
     payload = {"subject": subject, "body": final_body, "status": "draft", "email_type": "premium"}
 
     try:
-        response = requests.post(url, headers=headers, json=payload)
+        response = SESSION.post(url, headers=headers, data=json_dumps(payload))
         if response.status_code == 201:
             print(f"✅ Successfully created draft in Buttondown.")
         else:
@@ -39,98 +75,60 @@ def post_to_buttondown(subject, body_content):
         print(f"An error occurred during the API request: {e}")
 
 
+# Every fetch below goes through this helper. Results are kept per window for the
+# life of the process, so a script that asks for the same range twice makes one request.
+_recent_emails_cache = {}
+
+def fetch_recent_emails(days):
+    """
+    Fetches all public emails published in the last `days` days, newest first.
+    Raises requests.exceptions.RequestException / ValueError for the caller to report.
+    """
+    if days in _recent_emails_cache:
+        return _recent_emails_cache[days]
+
+    start_date_str = (datetime.now(timezone.utc) - timedelta(days=days)).strftime('%Y-%m-%d')
+    FILTERS = f"?ordering=-publish_date&type=public&publish_date__start={start_date_str}"
+
+    print(f"▶️ Fetching emails since {start_date_str} from Buttondown...")
+    response = SESSION.get(f"{BUTTONDOWN_BASE_URL}/v1{BUTTONDOWN_ENDPOINT}{FILTERS}")
+    response.raise_for_status()
+    emails = json_loads(response.content).get("results", [])
+    _recent_emails_cache[days] = emails
+    return emails
+
+
 # This function fetches the most recent public Sunday email from Buttondown.
 # It filters emails by publish date and ensures the email was published on a Sunday.
 
 def get_latest_sunday_buttondown_email():
-    """Fetches the most recent public Sunday email from Buttondown."""
-    headers = {"Authorization": f"Token {BUTTONDOWN_API_KEY}"}
-    two_weeks_ago = datetime.now(timezone.utc) - timedelta(days=14)
-    formatted_date = two_weeks_ago.strftime('%Y-%m-%d')
-    FILTERS = f"?ordering=-publish_date&type=public&publish_date__start={formatted_date}"
-    url = f"https://api.buttondown.email/v1/emails{FILTERS}"
-
+    """Fetches the most recent public Sunday email from the last 14 days."""
     try:
-        print(f"▶️ Fetching recent public emails from Buttondown (since {formatted_date})...")
-        # ... (rest of the function logic from linkedin_post_generator.py)
-        response = requests.get(url, headers=headers)
-        response.raise_for_status()
-        data = json.loads(response.content)
-        emails = data.get("results", [])
-        
-        if not emails:
-            print("No emails found...")
-            return None
-
-        for email in emails:
-            publish_date_str = email.get('publish_date')
-            if publish_date_str:
-                publish_date = datetime.fromisoformat(publish_date_str.replace('Z', '+00:00'))
-                if publish_date.weekday() == 6: # 6 = Sunday
-                    print(f"✅ Found latest Sunday email.")
-                    return email
-        
-        print("No Sunday email found.")
-        return None
-        
-    except requests.exceptions.RequestException as e:
+        emails = fetch_recent_emails(14)
+    except (requests.exceptions.RequestException, ValueError) as e:
         print(f"Error fetching email from Buttondown: {e}")
         return None
 
-# Alternative implementation of fetching the latest Sunday email
-# This version filters by a date range to ensure we capture the most recent Sunday.
-
-def get_latest_sunday_buttondown_email_alt():
-    """
-    Fetches the most recent public email from Buttondown that was published on a Sunday.
-    This version filters by a date range to ensure we capture the most recent Sunday.
-    """
-    headers = {
-        "Authorization": f"Token {BUTTONDOWN_API_KEY}",
-    }
-    
-    # Calculate the date 14 days ago to ensure we capture at least two weeks of emails.
-    two_weeks_ago = datetime.now(timezone.utc) - timedelta(days=14)
-    
-    # Format the date into a simple YYYY-MM-DD format.
-    formatted_date = two_weeks_ago.strftime('%Y-%m-%d')
-    
-    # Use the publish_date__start filter to get all emails published in the last 14 days.
-    FILTERS = f"?ordering=-publish_date&type=public&publish_date__start={formatted_date}"
+    if not emails:
+        print("No emails found...")
+        return None
 
-    try:
-        print("Fetching recent public emails from Buttondown (last 14 days)...")
-        response = requests.get(f"{BUTTONDOWN_BASE_URL}/v1{BUTTONDOWN_ENDPOINT}{FILTERS}", headers=headers)
-        response.raise_for_status()  # Raise an exception for HTTP errors
-        data = json.loads(response.content)
-        emails = data.get("results", [])
+    for email in emails:
+        publish_date_str = email.get('publish_date')
+        if publish_date_str:
+            publish_date = parse_publish_date(publish_date_str)
+            if publish_date.weekday() == 6: # 6 = Sunday
+                print(f"✅ Found latest Sunday email published on {publish_date.date()}.")
+                return email
 
-        if not emails:
-            print("No emails found from Buttondown API in the specified date range.")
-            return None
+    print("No Sunday email found.")
+    return None
 
-        # Iterate through the fetched emails to find the most recent one published on a Sunday.
-        for email in emails:
-            publish_date_str = email.get('publish_date')
-            if publish_date_str:
-                # The 'Z' at the end of the timestamp indicates UTC. `fromisoformat` can handle this.
-                publish_date = datetime.fromisoformat(publish_date_str.replace('Z', '+00:00'))
-                
-                # Check if the day of the week is Sunday.
-                # Monday is 0 and Sunday is 6.
-                if publish_date.weekday() == 6:
-                    print(f"Found latest Sunday email published on {publish_date.date()}.")
-                    return email
-
-        print("No Sunday email found in the recent batch of emails.")
-        return None
+# Kept for older callers; it used to be a second copy of the function above.
 
-    except requests.exceptions.RequestException as e:
-        print(f"Error fetching email from Buttondown: {e}")
-        return None
-    except json.JSONDecodeError:
-        print("Error decoding JSON response from Buttondown.")
-        return None
+def get_latest_sunday_buttondown_email_alt():
+    """Alias of get_latest_sunday_buttondown_email()."""
+    return get_latest_sunday_buttondown_email()
 
 # This function fetches all public emails from the last 7 days and prompts the user to select one.
 # It then returns the selected email's data.
@@ -139,19 +137,8 @@ def get_weekly_emails_and_prompt():
     """
     Fetches all public emails from the last 7 days and prompts the user to select one.
     """
-    headers = {"Authorization": f"Token {BUTTONDOWN_API_KEY}"}
-    
-    today = datetime.now(timezone.utc)
-    start_date = today - timedelta(days=7)
-    start_date_str = start_date.strftime('%Y-%m-%d')
-    
-    url = f"https://api.buttondown.email/v1/emails?ordering=-publish_date&type=public&publish_date__start={start_date_str}"
-
     try:
-        print(f"▶️ Fetching emails since {start_date_str} from Buttondown...")
-        response = requests.get(url, headers=headers)
-        response.raise_for_status()
-        emails = response.json().get("results", [])
+        emails = fetch_recent_emails(7)
 
         if not emails:
             print("⏹️ No emails found in the last 7 days.")
@@ -159,8 +146,7 @@ def get_weekly_emails_and_prompt():
 
         print("\n--- Emails Found in the Last 7 Days ---")
         for i, email in enumerate(emails):
-            publish_date = datetime.fromisoformat(email['publish_date'].replace('Z', '+00:00'))
-            date_display = publish_date.strftime('%Y-%m-%d (%a)')
+            date_display = format_publish_date(email['publish_date'])
             print(f"  {i + 1}. {date_display} - {email['subject']}")
         print("-" * 30)
 
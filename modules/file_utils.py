@@ -0,0 +1,83 @@
+import os
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+from datetime import datetime, timedelta
+from pathlib import Path
+from operator import itemgetter
+from concurrent.futures import ThreadPoolExecutor
+
+# One pooled session for the URL checks so a re-check of the same site reuses the
+# open TCP+TLS connection instead of handshaking again.
+SESSION = requests.Session()
+SESSION.mount("https://", HTTPAdapter(
+    pool_connections=4,
+    pool_maxsize=4,
+    max_retries=Retry(total=3, backoff_factor=0.3, status_forcelist=(429, 500, 502, 503, 504)),
+))
+
+# --- File & URL Functions ---
+
+def _iter_daily_markdown_files(root):
+    """Yields a DirEntry for every .md file under root whose path mentions 'hot-fudge-daily'."""
+    pending_dirs = [root]
+    while pending_dirs:
+        try:
+            entries = os.scandir(pending_dirs.pop())
+        except OSError:
+            continue
+        with entries:
+            for entry in entries:
+                if entry.is_dir(follow_symlinks=False):
+                    pending_dirs.append(entry.path)
+                elif entry.name.endswith(".md") and "hot-fudge-daily" in entry.path:
+                    yield entry
+
+def _mtime_or_none(entry):
+    try:
+        return entry.stat().st_mtime
+    except FileNotFoundError:
+        return None
+
+def find_recent_markdown_files(directory_path, days=7):
+    """Returns the 'hot-fudge-daily' markdown files modified in the last `days` days, newest first."""
+    if not directory_path:
+        print("ERROR: SYNC_PATH is not set in your .env file.")
+        return []
+
+    sync_path = Path(directory_path).expanduser()
+    if not sync_path.is_dir():
+        print(f"ERROR: The SYNC_PATH '{sync_path}' is not a valid directory.")
+        return []
+
+    threshold = (datetime.now() - timedelta(days=days)).timestamp()
+    entries = list(_iter_daily_markdown_files(str(sync_path)))
+
+    # Each file is stat'ed exactly once, and the stats run side by side: on a synced or
+    # network-mounted folder every stat can be a slow round trip.
+    with ThreadPoolExecutor(max_workers=8) as executor:
+        mtimes = list(executor.map(_mtime_or_none, entries))
+
+    recent_files = [(mtime, entry.path) for entry, mtime in zip(entries, mtimes)
+                    if mtime is not None and mtime > threshold]
+    recent_files.sort(key=itemgetter(0), reverse=True) # Newest first, on the mtime we already have
+    return [Path(path) for _, path in recent_files]
+
+def check_url_status(url):
+    """Checks if a URL is live: a 200, or a redirect (which is not followed)."""
+    try:
+        print(f"Checking URL: {url}")
+        # Redirects aren't walked; a 3xx from our own site already means the page is deployed.
+        response = SESSION.head(url, timeout=10, allow_redirects=False)
+        if response.status_code == 200:
+            print("✅ URL is live.")
+            return True
+        elif response.is_redirect:
+            print(f"✅ URL is live (redirects to {response.headers.get('Location')}).")
+            return True
+        else:
+            print(f"⚠️ URL returned status code {response.status_code}.")
+            return False
+    except requests.RequestException as e:
+        print(f"❌ Could not connect to URL: {e}")
+        return False
@@ -0,0 +1,18 @@
+import os
+import functools
+import frontmatter
+
+# --- Frontmatter Cache ---
+# Parsed posts are cached in-process, keyed by the file's path, mtime and size, so
+# loading the same unchanged markdown file twice in a run (e.g. the menu's title peek,
+# then the selected post) skips the second YAML parse. Saving the file changes its
+# mtime/size, which changes the key.
+
+@functools.lru_cache(maxsize=256)
+def _load_cached(path_str, mtime_ns, size):
+    return frontmatter.load(path_str)
+
+def load_post(file_path):
+    """Drop-in for frontmatter.load() that reuses the parse while the file is unchanged."""
+    stat = os.stat(file_path)
+    return _load_cached(str(file_path), stat.st_mtime_ns, stat.st_size)
@@ -1,6 +1,14 @@
 import os
 import requests
+from requests.adapters import HTTPAdapter
+from modules.http_utils import POST_SAFE_RETRY
 import json
+try:
+    # orjson serializes request payloads in C; fall back to the stdlib if absent.
+    import orjson
+    json_dumps = orjson.dumps
+except ImportError:
+    json_dumps = lambda obj: json.dumps(obj).encode("utf-8")
 import re
 from dotenv import load_dotenv
 
@@ -9,15 +17,33 @@ load_dotenv()
 GOTOSOCIAL_INSTANCE_URL = os.getenv("GOTOSOCIAL_INSTANCE_URL")
 GOTOSOCIAL_ACCESS_TOKEN = os.getenv("GOTOSOCIAL_ACCESS_TOKEN")
 
+# One pooled session for every GoToSocial call so sequential requests reuse the
+# same TCP+TLS connection instead of handshaking each time.
+SESSION = requests.Session()
+SESSION.mount("https://", HTTPAdapter(
+    pool_connections=4,
+    pool_maxsize=4,
+    max_retries=POST_SAFE_RETRY, # Retries POSTs too, but only when a re-send can't double-post
+))
+
+# --- Precompiled Formatting Patterns ---
+# Compiled once at import so format_for_gotosocial doesn't re-resolve patterns per call.
+HEADING_MARK_RE = re.compile(r'#+\s*')
+BOLD_RE = re.compile(r'(\*\*|__)')
+IMAGE_RE = re.compile(r'\[!\[.*?\]\(.*?\)\]\(.*?\)|!\[.*?\]\(.*?\)') # Bare and linked images
+LINK_RE = re.compile(r'\[(.*?)\]\(.*?\)')
+LIST_RE = re.compile(r'^\s*[\*\-]\s*', re.MULTILINE)
+BLANKS_RE = re.compile(r'\n{3,}')
+
 def format_for_gotosocial(subject, markdown_content, url):
     """Converts markdown content to a GoToSocial-friendly plain text format."""
     # Basic conversion: Remove markdown syntax, keep paragraphs
-    text = re.sub(r'#+\s*', '', markdown_content) # Remove headings
-    text = re.sub(r'(\*\*|__)', '', text)        # Remove bold/italic
-    text = re.sub(r'\[!\[.*?\]\(.*?\)\]\(.*?\)|!\[.*?\]\(.*?\)', '', text) # Remove images
-    text = re.sub(r'\[(.*?)\]\(.*?\)', r'\1', text) # Keep link text only
-    text = re.sub(r'^\s*[\*\-]\s*', '• ', text, flags=re.MULTILINE) # Basic lists
-    text = re.sub(r'\n{3,}', '\n\n', text).strip() # Consolidate newlines
+    text = HEADING_MARK_RE.sub('', markdown_content) # Remove headings
+    text = BOLD_RE.sub('', text)        # Remove bold/italic
+    text = IMAGE_RE.sub('', text)       # Remove images
+    text = LINK_RE.sub(r'\1', text)     # Keep link text only
+    text = LIST_RE.sub('• ', text)      # Basic lists
+    text = BLANKS_RE.sub('\n\n', text).strip() # Consolidate newlines
     return f"{subject}\n\n{text}\n\nRead the full post here: {url}"
 
 
@@ -33,7 +59,7 @@ def post_to_gotosocial(post_content):
     post_data = {"status": post_content, "visibility": "public"}
 
     try:
-        response = requests.post(post_url, headers=headers, json=post_data)
+        response = SESSION.post(post_url, headers=headers, data=json_dumps(post_data))
         response.raise_for_status()
         print("✅ Successfully posted to GoToSocial!")
     except requests.exceptions.RequestException as e:
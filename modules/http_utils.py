@@ -0,0 +1,26 @@
+from urllib3.util.retry import Retry
+
+# --- Shared Retry Policy ---
+# The platform sessions retry POSTs as well as GETs, so a rate limit or a brief outage
+# doesn't throw away a run (and its rendered GIF). A POST is only re-sent when the
+# server refused it outright (429/503); after any other 5xx or a dropped reply the
+# post may already exist, and re-sending it would publish it twice.
+POST_RETRY_STATUSES = frozenset({429, 503})
+
+class PostSafeRetry(Retry):
+    """Retry that also covers POST, but only on statuses that mean it wasn't processed."""
+
+    def is_retry(self, method, status_code, has_retry_after=False):
+        if method == "POST" and status_code not in POST_RETRY_STATUSES:
+            return False
+        return super().is_retry(method, status_code, has_retry_after)
+
+POST_SAFE_RETRY = PostSafeRetry(
+    total=4,
+    backoff_factor=0.5,
+    status_forcelist=(429, 500, 502, 503, 504),
+    allowed_methods=Retry.DEFAULT_ALLOWED_METHODS | {"POST"},
+    respect_retry_after_header=True,
+    read=False, # A read error after sending could mean it already went through
+    raise_on_status=False, # Hand back the last response so callers report it as usual
+)
@@ -1,6 +1,18 @@
 import os
+import functools
+import mimetypes
 import requests
+from requests.adapters import HTTPAdapter
+from modules.http_utils import POST_SAFE_RETRY
 import json
+try:
+    # orjson serializes payloads and parses raw response bytes in C; fall back to the stdlib if absent.
+    import orjson
+    json_dumps = orjson.dumps
+    json_loads = orjson.loads
+except ImportError:
+    json_dumps = lambda obj: json.dumps(obj).encode("utf-8")
+    json_loads = json.loads
 import re
 from dotenv import load_dotenv
 from mimetypes import guess_type
@@ -10,118 +22,64 @@ load_dotenv()
 LINKEDIN_ACCESS_TOKEN = os.getenv("LINKEDIN_ACCESS_TOKEN")
 LINKEDIN_AUTHOR = os.getenv("LINKEDIN_AUTHOR")
 
-# --- UPDATED: Advanced LinkedIn Formatting Function ---
-def format_for_linkedin(subject, description, markdown_content, url):
-    """
-    Converts markdown to a LinkedIn-friendly plain text format with footnotes.
-    This function contains the advanced formatting logic.
-    """
-    footnotes = []
-    
-    # --- FIX 1: Check for and remove repeated description ---
-    text = markdown_content
-    if description and text.lstrip().startswith(description):
-        # Remove the description text and any following newlines
-        text = text.lstrip()[len(description):].lstrip('\n')
-
-    def link_to_footnote(match):
-        link_text = match.group(1) # Group 1 is [text]
-        link_url = match.group(2)  # Group 2 is (url)
-        if link_text.startswith('!') or not link_url.startswith('http'):
-            return f"[{link_text}]({link_url})" # Ignore images or relative links
-        footnotes.append(link_url)
-        return f"{link_text} [{len(footnotes)}]"
-
-    def convert_md_table_to_list(match):
-        table_text = match.group(0)
-        lines = table_text.strip().split('\n')
-        if len(lines) < 3: return table_text
-        list_items = []
-        for row in lines[2:]:
-            columns = [col.strip() for col in row.split('|') if col.strip()]
-            if len(columns) >= 2:
-                list_items.append(f"• {' - '.join(columns)}")
-        return "\n".join(list_items) if list_items else ""
-
-    text = text.replace('\\*', '*').replace('\\$', '$').replace('\\_', '_')
-    text = re.sub(r'\{\{.*?\}\}', '', text, flags=re.IGNORECASE)
-    text = re.sub(r'```[\s\S]*?```', '', text)
-    text = re.sub(r'^\s*---\s*$', '', text, flags=re.MULTILINE)
-    
-    table_pattern = re.compile(r'^\s*\|.*\|.*\n\s*\|[-|: ]+\|.*\n((?:\s*\|.*\|.*\n?)+)', re.MULTILINE)
-    text = table_pattern.sub(convert_md_table_to_list, text)
-    
-    # --- FIX 2: More robust regex for links. Handles ')' in link text. ---
-    text = re.sub(r'\[([^\]]+)\]\(([^)]+)\)', link_to_footnote, text)
-    
-    # Clean up daily-themed headings (adjust patterns as needed)
-    text = re.sub(r'#+\s*📈\s*Markets Monday.*', '📈 Markets Monday', text, flags=re.IGNORECASE)
-    text = re.sub(r'#+\s*🔥\s*Hot Takes Tuesday.*', '🔥 Hot Takes Tuesday', text, flags=re.IGNORECASE)
-    text = re.sub(r'#+\s*🤪\s*Wacky Wednesday.*', '🤪 Wacky Wednesday', text, flags=re.IGNORECASE)
-    text = re.sub(r'#+\s*🔙\s*Throwback Thursday.*', '🔙 Throwback Thursday', text, flags=re.IGNORECASE)
-    text = re.sub(r'#+\s*✅\s*Final Thoughts Friday.*', '✅ Final Thoughts Friday', text, flags=re.IGNORECASE)
-    text = re.sub(r'#+\s*🔮\s*Sneak Peak Saturday.*', '🔮 Sneak Peak Saturday', text, flags=re.IGNORECASE)
-
-    # --- FIX 3: Better heading formatting to add spacing (from linkedin_sync.py) ---
-    text = re.sub(r'^#+\s*(.+)$', r'\n\n\1\n', text, flags=re.MULTILINE)
-    
-    text = re.sub(r'([\.!\?])\s*([A-Z])', r'\1\n\n\2', text) # Add paragraph breaks
-    text = re.sub(r'(\*\*|__)', '', text) # Remove bold/italic
-    
-    # --- FIX 4: Convert bullet points (this should work correctly now) ---
-    text = re.sub(r'^\s*[\*\-]\s*', '• ', text, flags=re.MULTILINE)
-    
-    text = re.sub(r'\n{3,}', '\n\n', text).strip() # Clean up extra newlines
-
-    footnote_section = ""
-    if footnotes:
-        footnote_lines = [f"[{i+1}] {url}" for i, url in enumerate(footnotes)]
-        footnote_section = "\n\n---\nSources:\n" + "\n".join(footnote_lines)
-    
-    return f"{subject}\n\n{description}\n\n{text}{footnote_section}\n\nRead the full post here: {url}"
-
-# --- NEW: Post to LinkedIn Version 1.0
+# One pooled session for every LinkedIn call so sequential requests reuse the
+# same TCP+TLS connection instead of handshaking each time.
+SESSION = requests.Session()
+SESSION.mount("https://", HTTPAdapter(
+    pool_connections=4,
+    pool_maxsize=4,
+    max_retries=POST_SAFE_RETRY, # Retries POSTs too, but only when a re-send can't double-post
+))
+
+# --- Precompiled Formatting Patterns ---
+# Compiled once at import so the format functions don't re-resolve patterns per call.
+DAY_HEADERS = {
+    "markets monday": "📈 Markets Monday",
+    "hot takes tuesday": "🔥 Hot Takes Tuesday",
+    "wacky wednesday": "🤪 Wacky Wednesday",
+    "throwback thursday": "🔙 Throwback Thursday",
+    "final thoughts friday": "✅ Final Thoughts Friday",
+    "sneak peak saturday": "🔮 Sneak Peak Saturday",
+}
+# One alternation replaces the six per-day substitutions (one scan instead of six).
+DAY_RE = re.compile(
+    r'#+\s*(?:📈|🔥|🤪|🔙|✅|🔮)\s*'
+    r'(Markets Monday|Hot Takes Tuesday|Wacky Wednesday|Throwback Thursday|Final Thoughts Friday|Sneak Peak Saturday).*',
+    re.IGNORECASE,
+)
+ESCAPE_RE = re.compile(r'\\([*$_])')
+TEMPLATE_RE = re.compile(r'\{\{.*?\}\}', re.IGNORECASE)
+SHORTCODE_RE = re.compile(r'{{<.*? >}}', re.IGNORECASE | re.DOTALL) # Handles multi-line shortcodes
+CODE_FENCE_RE = re.compile(r'```[\s\S]*?```')
+HR_RE = re.compile(r'^\s*---\s*$', re.MULTILINE)
+TABLE_RE = re.compile(r'^\s*\|.*\|.*\n\s*\|[-|: ]+\|.*\n((?:\s*\|.*\|.*\n?)+)', re.MULTILINE)
+LINK_RE = re.compile(r'\[([^\]]+)\]\(([^)]+)\)') # Handles ')' in link text
+HEADING_RE = re.compile(r'^#+\s*(.+)$', re.MULTILINE)
+SENTENCE_RE = re.compile(r'([\.!\?])\s*(?=[A-Z])')
+SENTENCE_SPACE_RE = re.compile(r'([\.!\?])\s+(?=[A-Z])') # Only breaks where there was whitespace
+BOLD_RE = re.compile(r'(\*\*|__)')
+LIST_RE = re.compile(r'^\s*[\*\-]\s*', re.MULTILINE)
+LIST_ITEM_RE = re.compile(r'^\s*[\*\-]\s+', re.MULTILINE) # Requires a space after the marker
+BLANKS_RE = re.compile(r'\n{3,}')
+
+# Load the mime.types database once at import instead of lazily on the first upload.
+mimetypes.init()
+
+@functools.lru_cache(maxsize=64)
+def media_type_for_extension(extension):
+    """Guesses a Content-Type from a file extension like '.gif', caching the result."""
+    return guess_type(f"media{extension}")[0]
 
-def post_to_linkedin(post_content):
-    """Posts the given content to LinkedIn."""
-    print("\n--- 🔗 Posting to LinkedIn... ---")
-    if not all([LINKEDIN_ACCESS_TOKEN, LINKEDIN_AUTHOR]):
-        print("❌ LinkedIn credentials not found in .env file.")
-        return
-
-    headers = {
-        "Authorization": f"Bearer {LINKEDIN_ACCESS_TOKEN}",
-        "Content-Type": "application/json",
-        "x-li-format": "json",
-        "X-Restli-Protocol-Version": "2.0.0"
-    }
-    
-    post_data = {
-        "author": f"{LINKEDIN_AUTHOR}",
-        "lifecycleState": "PUBLISHED",
-        "specificContent": {
-            "com.linkedin.ugc.ShareContent": {
-                "shareCommentary": {"text": post_content},
-                "shareMediaCategory": "NONE"
-            }
-        },
-        "visibility": {"com.linkedin.ugc.MemberNetworkVisibility": "PUBLIC"}
-    }
-    try:
-        response = requests.post("https://api.linkedin.com/v2/ugcPosts", headers=headers, json=post_data)
-        response.raise_for_status()
-        print("✅ Successfully posted to LinkedIn!")
-    except requests.exceptions.RequestException as e:
-        print(f"❌ Error posting to LinkedIn: {e}\n   Response: {e.response.text}")
-
-# --- NEW: Post to LinkedIn with Media Version 1.0 ---
-
-def format_for_linkedin2(subject, description, markdown_content, url):
+# --- UPDATED: Advanced LinkedIn Formatting Function ---
+def _format_markdown(subject, description, markdown_content, url, *,
+                     tag_re, link_prefixes, sentence_re, list_re):
     """
     Converts markdown to a LinkedIn-friendly plain text format with footnotes.
-    (Using the advanced version provided in the prompt)
+    The keyword arguments carry the few rules where the two public formatters differ:
+    which tags are stripped, which URLs become footnotes, and where sentences and list
+    items break.
     """
-    footnotes = []
+    footnotes = {} # url -> footnote number, in first-cited order
 
     # Check for and remove repeated description
     text = markdown_content
@@ -132,11 +90,12 @@ def format_for_linkedin2(subject, description, markdown_content, url):
         link_text = match.group(1) # [text]
         link_url = match.group(2)  # (url)
         # Ignore images or relative links (basic check)
-        if link_text.startswith('!') or not link_url.startswith(('http://', 'https://')):
+        if link_text.startswith('!') or not link_url.startswith(link_prefixes):
             # Reconstruct the original markdown link/image if it's not an external link
              return f"[{link_text}]({link_url})"
-        footnotes.append(link_url)
-        return f"{link_text} [{len(footnotes)}]"
+        # A URL cited more than once reuses its first footnote number
+        number = footnotes.setdefault(link_url, len(footnotes) + 1)
+        return f"{link_text} [{number}]"
 
 
     def convert_md_table_to_list(match):
@@ -153,52 +112,103 @@ def format_for_linkedin2(subject, description, markdown_content, url):
         return "\n".join(list_items) if list_items else "" # Return joined list or empty string
 
 
-    text = text.replace('\\*', '*').replace('\\$', '$').replace('\\_', '_')
-    # Remove Hugo shortcodes or similar patterns more carefully
-    text = re.sub(r'{{<.*? >}}', '', text, flags=re.IGNORECASE | re.DOTALL) # Handle multi-line shortcodes
-    text = re.sub(r'```[\s\S]*?```', '', text) # Remove code blocks
-    text = re.sub(r'^\s*---\s*$', '', text, flags=re.MULTILINE) # Remove horizontal rules
+    text = ESCAPE_RE.sub(r'\1', text) # Unescape \* \$ \_ in one pass
+    # Separate passes, in this order: removing a tag or fence can leave a '---' alone
+    # on its line, and the rule pass then deletes it.
+    text = tag_re.sub('', text)
+    text = CODE_FENCE_RE.sub('', text)
+    text = HR_RE.sub('', text)
 
     # Process tables first
-    table_pattern = re.compile(r'^\s*\|.*\|.*\n\s*\|[-|: ]+\|.*\n((?:\s*\|.*\|.*\n?)+)', re.MULTILINE)
-    text = table_pattern.sub(convert_md_table_to_list, text)
+    text = TABLE_RE.sub(convert_md_table_to_list, text)
 
     # Process links after tables to avoid messing up table formatting
-    text = re.sub(r'\[([^\]]+)\]\(([^)]+)\)', link_to_footnote, text)
+    text = LINK_RE.sub(link_to_footnote, text)
 
     # Clean up daily-themed headings
-    text = re.sub(r'#+\s*📈\s*Markets Monday.*', '📈 Markets Monday', text, flags=re.IGNORECASE | re.MULTILINE)
-    text = re.sub(r'#+\s*🔥\s*Hot Takes Tuesday.*', '🔥 Hot Takes Tuesday', text, flags=re.IGNORECASE | re.MULTILINE)
-    text = re.sub(r'#+\s*🤪\s*Wacky Wednesday.*', '🤪 Wacky Wednesday', text, flags=re.IGNORECASE | re.MULTILINE)
-    text = re.sub(r'#+\s*🔙\s*Throwback Thursday.*', '🔙 Throwback Thursday', text, flags=re.IGNORECASE | re.MULTILINE)
-    text = re.sub(r'#+\s*✅\s*Final Thoughts Friday.*', '✅ Final Thoughts Friday', text, flags=re.IGNORECASE | re.MULTILINE)
-    text = re.sub(r'#+\s*🔮\s*Sneak Peak Saturday.*', '🔮 Sneak Peak Saturday', text, flags=re.IGNORECASE | re.MULTILINE)
+    text = DAY_RE.sub(lambda m: DAY_HEADERS[m.group(1).lower()], text)
 
     # Convert Markdown headings to plain text with spacing
-    text = re.sub(r'^#+\s*(.+)$', r'\n\n\1\n', text, flags=re.MULTILINE)
+    text = HEADING_RE.sub(r'\n\n\1\n', text)
 
     # Add paragraph breaks after sentences ending with . ! ? followed by a capital letter
-    text = re.sub(r'([\.!\?])\s+(?=[A-Z])', r'\1\n\n', text)
+    text = sentence_re.sub(r'\1\n\n', text)
 
-    text = re.sub(r'(\*\*|__)', '', text) # Remove bold/italic markup
+    text = BOLD_RE.sub('', text) # Remove bold/italic markup
 
     # Convert Markdown list items (* or -) to bullet points (•)
-    text = re.sub(r'^\s*[\*\-]\s+', '• ', text, flags=re.MULTILINE)
+    text = list_re.sub('• ', text)
 
     # Remove any leftover heading markers (should be redundant if heading conversion worked)
     # text = re.sub(r'^#+\s*', '', text, flags=re.MULTILINE)
 
     # Consolidate multiple newlines
-    text = re.sub(r'\n{3,}', '\n\n', text).strip()
+    text = BLANKS_RE.sub('\n\n', text).strip()
 
-    footnote_section = ""
+    # Final assembly: collect every piece (footnotes included) and join once, so the
+    # post body is copied a single time instead of through nested concatenations.
+    parts = [f"{subject}\n\n{description}\n\n", text]
     if footnotes:
-        footnote_lines = [f"[{i+1}] {url}" for i, url in enumerate(footnotes)]
-        footnote_section = "\n\n---\nSources:\n" + "\n".join(footnote_lines)
+        parts.append("\n\n---\nSources:")
+        parts.extend(f"\n[{i}] {footnote_url}" for i, footnote_url in enumerate(footnotes, start=1))
+    parts += ["\n\nRead the full post here: ", url]
+    return "".join(parts)
+
+def format_for_linkedin(subject, description, markdown_content, url):
+    """
+    Converts markdown to a LinkedIn-friendly plain text format with footnotes.
+    Strips {{ template tags }}, footnotes any 'http' link, and breaks sentences and
+    list markers even without a following space.
+    """
+    return _format_markdown(subject, description, markdown_content, url,
+                            tag_re=TEMPLATE_RE, link_prefixes='http',
+                            sentence_re=SENTENCE_RE, list_re=LIST_RE)
+
+def format_for_linkedin2(subject, description, markdown_content, url):
+    """
+    Converts markdown to a LinkedIn-friendly plain text format with footnotes.
+    Strips {{< Hugo shortcodes >}}, footnotes only http(s):// links, and breaks
+    sentences and list markers only where whitespace follows.
+    """
+    return _format_markdown(subject, description, markdown_content, url,
+                            tag_re=SHORTCODE_RE, link_prefixes=('http://', 'https://'),
+                            sentence_re=SENTENCE_SPACE_RE, list_re=LIST_ITEM_RE)
+
+# --- NEW: Post to LinkedIn Version 1.0
+
+def post_to_linkedin(post_content):
+    """Posts the given content to LinkedIn."""
+    print("\n--- 🔗 Posting to LinkedIn... ---")
+    if not all([LINKEDIN_ACCESS_TOKEN, LINKEDIN_AUTHOR]):
+        print("❌ LinkedIn credentials not found in .env file.")
+        return
 
-    # Final assembly
-    return f"{subject}\n\n{description}\n\n{text}{footnote_section}\n\nRead the full post here: {url}"
+    headers = {
+        "Authorization": f"Bearer {LINKEDIN_ACCESS_TOKEN}",
+        "Content-Type": "application/json",
+        "x-li-format": "json",
+        "X-Restli-Protocol-Version": "2.0.0"
+    }
+    
+    post_data = {
+        "author": f"{LINKEDIN_AUTHOR}",
+        "lifecycleState": "PUBLISHED",
+        "specificContent": {
+            "com.linkedin.ugc.ShareContent": {
+                "shareCommentary": {"text": post_content},
+                "shareMediaCategory": "NONE"
+            }
+        },
+        "visibility": {"com.linkedin.ugc.MemberNetworkVisibility": "PUBLIC"}
+    }
+    try:
+        response = SESSION.post("https://api.linkedin.com/v2/ugcPosts", headers=headers, data=json_dumps(post_data))
+        response.raise_for_status()
+        print("✅ Successfully posted to LinkedIn!")
+    except requests.exceptions.RequestException as e:
+        print(f"❌ Error posting to LinkedIn: {e}\n   Response: {e.response.text}")
 
+# --- NEW: Post to LinkedIn with Media Version 1.0 ---
 
 def post_to_linkedin2(post_content):
     """Posts TEXT-ONLY content to LinkedIn."""
@@ -226,7 +236,7 @@ def post_to_linkedin2(post_content):
         "visibility": {"com.linkedin.ugc.MemberNetworkVisibility": "PUBLIC"}
     }
     try:
-        response = requests.post("https://api.linkedin.com/v2/ugcPosts", headers=headers, json=post_data)
+        response = SESSION.post("https://api.linkedin.com/v2/ugcPosts", headers=headers, data=json_dumps(post_data))
         response.raise_for_status()
         print("✅ Successfully posted text to LinkedIn!")
         return True # Indicate success
@@ -265,13 +275,13 @@ def post_to_linkedin_with_media(post_content, media_filename, subject):
     }
 
     try:
-        r_register = requests.post(
+        r_register = SESSION.post(
             "https://api.linkedin.com/v2/assets?action=registerUpload",
             headers=register_headers,
-            json=register_data
+            data=json_dumps(register_data)
         )
         r_register.raise_for_status()
-        register_response = r_register.json()
+        register_response = json_loads(r_register.content)
 
         upload_url = register_response["value"]["uploadMechanism"]["com.linkedin.digitalmedia.uploading.MediaUploadHttpRequest"]["uploadUrl"]
         asset_urn = register_response["value"]["asset"]
@@ -283,11 +293,14 @@ def post_to_linkedin_with_media(post_content, media_filename, subject):
         if hasattr(e, 'response') and e.response is not None:
              print(f"   Response: {e.response.text}")
         return False # Indicate failure
+    except ValueError as e: # Reply body wasn't valid JSON
+        print(f"\n❌ Error decoding upload registration response: {e}")
+        return False
 
     # === 2. Upload the Media File ===
     print(f"  2. Uploading '{media_filename}'...")
 
-    content_type, _ = guess_type(media_filename)
+    content_type = media_type_for_extension(os.path.splitext(media_filename)[1].lower())
     if not content_type:
         content_type = "image/gif" # Default if guess fails
         print(f"  ⚠️ Could not guess mime type, defaulting to {content_type}")
@@ -298,14 +311,14 @@ def post_to_linkedin_with_media(post_content, media_filename, subject):
     }
 
     try:
+        # Stream the file from disk rather than reading it all into memory first;
+        # requests sets Content-Length from the file size.
         with open(media_filename, 'rb') as f:
-            media_data = f.read()
-
-        r_upload = requests.put( # Use PUT for the upload URL
-            upload_url,
-            headers=upload_headers,
-            data=media_data
-        )
+            r_upload = SESSION.put( # Use PUT for the upload URL
+                upload_url,
+                headers=upload_headers,
+                data=f
+            )
         r_upload.raise_for_status()
         # LinkedIn upload URL often returns 201 Created on success
         if r_upload.status_code not in [200, 201]:
@@ -354,7 +367,7 @@ def post_to_linkedin_with_media(post_content, media_filename, subject):
     }
 
     try:
-        r_post = requests.post("https://api.linkedin.com/v2/ugcPosts", headers=post_headers, json=post_data)
+        r_post = SESSION.post("https://api.linkedin.com/v2/ugcPosts", headers=post_headers, data=json_dumps(post_data))
         r_post.raise_for_status()
         print("\n✅ Successfully posted to LinkedIn with media!")
         return True # Indicate success
@@ -0,0 +1,160 @@
+from contextlib import ExitStack
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+from modules.file_utils import find_recent_markdown_files, check_url_status
+from modules.frontmatter_cache import load_post
+
+# --- Shared Publishing Workflow ---
+# post_to_socials2.py and social_sync.py walk the same steps: pick a recent file, load
+# its frontmatter, make sure the page is live, choose platforms, preview/confirm each
+# one, then publish. Each script only supplies its own platform handlers.
+
+def _peek_title(file_path):
+    """Returns a file's frontmatter title for the menu, or None if it can't be read."""
+    try:
+        return load_post(file_path).metadata.get('title')
+    except Exception:
+        return None
+
+def select_recent_post(sync_path, site_base_url, default_title=None):
+    """
+    Lists the recent markdown files, prompts for one, and loads it.
+    Returns a dict with file, subject, description, markdown_content and full_url,
+    or None if nothing was selected or the post isn't live yet. A post without a
+    'title' uses default_title, or is rejected when default_title is None.
+    """
+    recent_files = find_recent_markdown_files(sync_path)
+
+    if not recent_files:
+        print("No recent markdown files found to sync.")
+        return None
+
+    # Every listed file's title is loaded side by side for the menu. load_post caches
+    # each parse, so the file picked below is already loaded by the time it's used.
+    with ThreadPoolExecutor(max_workers=8) as executor:
+        titles = list(executor.map(_peek_title, recent_files))
+
+    print("\n--- Recent Markdown Files (Last 7 Days) ---")
+    for i, (file_path, title) in enumerate(zip(recent_files, titles)):
+        print(f"  {i + 1}. {file_path.name}" + (f" — {title}" if title else ""))
+    print("-" * 30)
+
+    try:
+        choice = input("Enter the number of the file to publish: ").strip()
+        index = int(choice) - 1
+        if not (0 <= index < len(recent_files)):
+            raise ValueError("Invalid number.")
+        file_to_post = recent_files[index]
+    except (ValueError, IndexError):
+        print("❌ Invalid selection. Exiting.")
+        return None
+
+    # --- Load and verify file content ---
+    try:
+        post = load_post(file_to_post)
+        subject = post.metadata.get('title', default_title)
+        description = post.metadata.get('description', '') # Optional
+        permalink = post.metadata.get('permalink')
+
+        if not subject or not permalink:
+            print("❌ 'title' and/or 'permalink' missing in frontmatter. Cannot proceed.")
+            return None
+
+        # Joined by hand: urljoin on stripped parts drops the permalink's trailing slash
+        # and replaces the base's last path segment when it has one.
+        full_url = site_base_url.rstrip('/') + '/' + permalink.lstrip('/')
+
+        print(f"\n📄 Selected file: {file_to_post.name}")
+        print(f"   Subject: {subject}")
+        print(f"   Permalink: {permalink}")
+        print(f"   Full URL: {full_url}")
+
+        if not check_url_status(full_url):
+            print("   Post URL is not live yet. Please deploy your site and try again.")
+            return None
+
+    except Exception as e:
+        print(f"❌ Error reading or parsing the markdown file {file_to_post}: {e}")
+        return None
+
+    return {
+        "file": file_to_post,
+        "subject": subject,
+        "description": description,
+        "markdown_content": post.content,
+        "full_url": full_url,
+    }
+
+def print_dry_run(platform_name, *lines):
+    """Prints the preview banner shown before each platform's confirmation."""
+    print("\n" + "="*50)
+    print(f"                DRY RUN for {platform_name}")
+    print("="*50)
+    for line in lines:
+        print(line)
+    print("="*50)
+
+def confirm(question):
+    """Asks a y/N question; anything but 'y' is a no."""
+    return input(f"{question} (y/N): ").lower() == 'y'
+
+def run_publish_workflow(platforms, sync_path, site_base_url, default_title=None):
+    """
+    Runs the interactive publish flow.
+
+    `platforms` maps a menu key ('1', '2', ...) to (menu label, prepare). Each
+    prepare(post, cleanup) previews the post, asks for confirmation, and returns a
+    zero-arg function that publishes it, or None if cancelled. `cleanup` registers a
+    callback (e.g. deleting a temp file) that runs once publishing is over, however
+    the run ends. An "All of the above" entry is added after the given platforms.
+    `default_title` is passed through to select_recent_post.
+    """
+    print("--- Unified Social Publishing Sync ---")
+    post = select_recent_post(sync_path, site_base_url, default_title)
+    if not post:
+        return
+
+    # --- Platform Selection ---
+    all_key = str(len(platforms) + 1)
+    print("\nWhich platforms do you want to post to?")
+    for key, (label, _) in platforms.items():
+        print(f"  {key}. {label}")
+    print(f"  {all_key}. All of the above")
+    platform_choice = input(f"Enter your choice(s) (e.g., '1,3' or '{all_key}'): ").strip().lower()
+
+    if not platform_choice:
+        print("No platforms selected. Exiting.")
+        return
+
+    # Determine which platforms to target based on input
+    choices = set(c.strip() for c in platform_choice.split(','))
+    selected = [key for key in platforms if key in choices or all_key in choices]
+
+    if not selected:
+         print("Invalid platform selection. Exiting.")
+         return
+
+    # Each platform is previewed and confirmed in turn; the confirmed posts are then
+    # sent together at the end, since they're independent network round trips.
+    with ExitStack() as cleanups:
+        pending_posts = [] # (platform name, zero-arg function that publishes)
+        for key in selected:
+            label, prepare = platforms[key]
+            publish = prepare(post, cleanups.callback)
+            if publish:
+                pending_posts.append((label, publish))
+
+        # --- Publish ---
+        # The posts are I/O-bound and independent, so run them side by side: total time is
+        # the slowest platform rather than the sum of all of them.
+        if pending_posts:
+            print(f"\n🚀 Publishing to {', '.join(name for name, _ in pending_posts)}...")
+            with ThreadPoolExecutor(max_workers=len(pending_posts)) as executor:
+                futures = {executor.submit(publish): name for name, publish in pending_posts}
+                for future in as_completed(futures):
+                    try:
+                        future.result()
+                    except Exception as e:
+                        print(f"❌ Unexpected error publishing to {futures[future]}: {e}")
+
+    print("\n--- Sync Complete ---")
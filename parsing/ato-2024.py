@@ -1,7 +1,34 @@
 import requests
-from bs4 import BeautifulSoup
+from lxml import html as lh
 import os
 
+# The page is queried with XPath straight on lxml's tree, so matching and text
+# extraction run in libxml2 instead of through BeautifulSoup's Python wrappers.
+def has_class(class_name):
+  """XPath test for elements whose class list includes class_name."""
+  return f"contains(concat(' ', normalize-space(@class), ' '), ' {class_name} ')"
+
+def div_xpath(div_tag):
+  """
+  Builds an XPath (and its variables) selecting divs with the given attributes.
+  Like BeautifulSoup, a single class name matches any one of a div's classes,
+  while a space-separated value has to match the whole class attribute.
+  """
+  tests, variables = [], {}
+  for i, (name, value) in enumerate(div_tag.items()):
+    variables[f'v{i}'] = value
+    if name == 'class' and ' ' not in value.strip():
+      tests.append(f"contains(concat(' ', normalize-space(@class), ' '), concat(' ', $v{i}, ' '))")
+    elif name == 'class':
+      tests.append(f"normalize-space(@class)=normalize-space($v{i})")
+    else:
+      tests.append(f"@{name}=$v{i}")
+  return f"//div[{' and '.join(tests)}]", variables
+
+def text_of(element):
+  """Same as BeautifulSoup's get_text(strip=True): each text node stripped, then joined."""
+  return ''.join(text.strip() for text in element.xpath('.//text()'))
+
 def extract_div_content(source, div_tag=None):
   """
   Extracts content from specific div tags in a given URL or HTML file,
@@ -19,31 +46,30 @@ def extract_div_content(source, div_tag=None):
     matching div.
   """
 
+  xpath, variables = div_xpath(div_tag or {'class': "ato-speaker col c6 b2c6 b3c4 b5c3"})
+
   try:
     if source.startswith('http://') or source.startswith('https://'):
       # It's a URL
       response = requests.get(source)
       response.raise_for_status()
-      soup = BeautifulSoup(response.content, 'html.parser')
+      tree = lh.fromstring(response.content)
     elif os.path.isfile(source):
       # It's a local file
-      with open(source, 'r') as f:
-        soup = BeautifulSoup(f, 'html.parser')
+      with open(source, 'rb') as f:
+        tree = lh.fromstring(f.read())
     else:
       print("Error: Invalid source. Please provide a URL or a valid local HTML file path.")
       return []
 
-    if div_tag:
-      divs = soup.find_all('div', div_tag)
-    else:
-      divs = soup.find_all('div', class_="ato-speaker col c6 b2c6 b3c4 b5c3")
+    divs = tree.xpath(xpath, **variables)
 
     results = []
     for div in divs:
-      url = div.find('a')['href']
-      speaker = div.find(class_='ato-speaker-name').get_text(strip=True).replace('\n', '')
-      title = div.find(class_='ato-speaker-title').get_text(strip=True).replace('\n', '')
-      company = div.find(class_='ato-speaker-employer').get_text(strip=True).replace('\n', '')
+      url = div.xpath('.//a')[0].attrib['href']
+      speaker = text_of(div.xpath(f".//*[{has_class('ato-speaker-name')}]")[0]).replace('\n', '')
+      title = text_of(div.xpath(f".//*[{has_class('ato-speaker-title')}]")[0]).replace('\n', '')
+      company = text_of(div.xpath(f".//*[{has_class('ato-speaker-employer')}]")[0]).replace('\n', '')
       results.append(f"{speaker}|{title}|{company}|{url}")
     return results
 
@@ -1,5 +1,11 @@
 import feedparser
-import time
+import calendar
+import functools
+
+@functools.lru_cache(maxsize=None)
+def format_published(year, month, day):
+    """Formats a date as '2024 Oct 06'; several entries often share a date, so it's cached."""
+    return f"{year} {calendar.month_abbr[month]} {day:02d}"
 
 def get_sunday_articles(rss_feed_url):
     """
@@ -10,17 +16,16 @@ def get_sunday_articles(rss_feed_url):
       rss_feed_url: The URL of the RSS feed.
     """
     feed = feedparser.parse(rss_feed_url)
-    articles = []
-
-    for entry in feed.entries:
-        if entry.published_parsed.tm_wday == 6:  # 6 represents Sunday
-            published = time.strftime('%Y %b %d', entry.published_parsed)
-            articles.append(f" - [{entry['title']}]({entry['link']}) {published}")
+    # Entries without a parsed date are skipped rather than raising AttributeError.
+    articles = [
+        f" - [{entry['title']}]({entry['link']}) {format_published(*entry.published_parsed[:3])}"
+        for entry in feed.entries
+        if entry.get('published_parsed') and entry.published_parsed.tm_wday == 6  # 6 represents Sunday
+    ]
 
     if articles:
-        print("Articles published on Sunday:")
-        for article in articles:
-            print(article)
+        # One write for the whole list instead of a print per article
+        print("Articles published on Sunday:\n" + "\n".join(articles))
     else:
         print("No articles published on Sunday found.")
 
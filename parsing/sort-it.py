@@ -1,5 +1,22 @@
 import re
-from datetime import datetime
+from datetime import date
+from operator import itemgetter
+
+# Compiled once; list items look like "- [Title](url) 2024 Oct 06"
+LINE_RE = re.compile(r'[\s-]*\[(.*?)\]\((.*?)\)\s*(.*)')
+DATE_RE = re.compile(r'(\d{4})\s+([A-Za-z]{3})\s+(\d{1,2})')
+# Parsing "%Y %b %d" by hand with a month table is far cheaper than datetime.strptime,
+# which goes through the locale-aware _strptime machinery on every call.
+MONTHS = {name: i for i, name in enumerate(
+    ['Jan', 'Feb', 'Mar', 'Apr', 'May', 'Jun', 'Jul', 'Aug', 'Sep', 'Oct', 'Nov', 'Dec'], start=1)}
+
+def parse_date(date_str):
+    """Parses a '2024 Oct 06' style date, raising ValueError like strptime would."""
+    match = DATE_RE.fullmatch(date_str)
+    month = match and MONTHS.get(match.group(2).title())
+    if not month:
+        raise ValueError(f"time data {date_str!r} does not match format '%Y %b %d'")
+    return date(int(match.group(1)), month, int(match.group(3)))
 
 def process_markdown(file_path):
     with open(file_path, 'r') as f:
@@ -8,22 +25,21 @@ def process_markdown(file_path):
     # Split the content into lines
     lines = content.splitlines()
     
-    # Initialize an empty list to store the extracted data
+    # Initialize an empty list to store the extracted (date, title, url) tuples
     data = []
 
     # Extract the title, URL, and date posted from each list item using regex
     for line in lines:
-        match = re.match(r'[\s-]*\[(.*?)\]\((.*?)\)\s*(.*)', line)
+        match = LINE_RE.match(line)
         if match:
             title = match.group(1)
             url = match.group(2)
             date_str = match.group(3).strip()
             if date_str:  # Check if date_str is not empty
-                date_obj = datetime.strptime(date_str, '%Y %b %d')
-                data.append({'title': title, 'url': url, 'date': date_obj})
+                data.append((parse_date(date_str), title, url))
 
     # Sort the data list in reverse chronological order
-    data.sort(key=lambda x: x['date'], reverse=True)
+    data.sort(key=itemgetter(0), reverse=True)
 
     # Generate output file name
     output_file_path = "sorted-" + file_path
@@ -31,8 +47,8 @@ def process_markdown(file_path):
     # Output the updated markdown list to the output file
     with open(output_file_path, 'w') as outfile:
         outfile.write("# Newsletters published in 2024\n")
-        for item in data:
-            outfile.write(f"- [{item['title']}]({item['url']}) {item['date'].strftime('%Y %b %d')}\n")
+        for date_obj, title, url in data:
+            outfile.write(f"- [{title}]({url}) {date_obj.strftime('%Y %b %d')}\n")
 
 # Ask for the input file name
 file_path = input("Enter the input file name: ")
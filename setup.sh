@@ -4,8 +4,10 @@ python3 -m venv my_env
 source my_env/bin/activate
 pip3 install -U pip
 pip3 install -U bs4
+pip3 install -U lxml
 pip3 install -U setuptools
 pip3 install -U requests
+pip3 install -U orjson
 pip3 install -U rich
 pip3 install -U python-dateutil
 pip3 install -U datetime
@@ -1,12 +1,11 @@
 import os
 import requests
-import frontmatter
+from requests.adapters import HTTPAdapter
+from modules.http_utils import POST_SAFE_RETRY
 import sys
 from dotenv import load_dotenv
-from datetime import datetime, timedelta
-from pathlib import Path
 import re
-from urllib.parse import urljoin
+from modules.workflow import run_publish_workflow, print_dry_run, confirm
 
 # --- Load Environment Variables ---
 load_dotenv()
@@ -27,47 +26,35 @@ GOTOSOCIAL_ACCESS_TOKEN = os.getenv("GOTOSOCIAL_ACCESS_TOKEN")
 if not all([BUTTONDOWN_API_KEY, SYNC_PATH_STR, SITE_BASE_URL]):
     raise ValueError("One or more required environment variables are missing in your .env file.")
 
-# --- File & URL Functions ---
-
-def find_recent_markdown_files(directory_path, days=7):
-    if not directory_path:
-        print("ERROR: SYNC_PATH is not set in your .env file.")
-        return []
-
-    sync_path = Path(directory_path).expanduser()
-    if not sync_path.is_dir():
-        print(f"ERROR: The SYNC_PATH '{sync_path}' is not a valid directory.")
-        return []
-
-    recent_files = []
-    time_threshold = datetime.now() - timedelta(days=days)
-
-    for file_path in sync_path.rglob("*.md"):
-        if "hot-fudge-daily" in file_path.as_posix():
-            try:
-                modified_time = datetime.fromtimestamp(file_path.stat().st_mtime)
-                if modified_time > time_threshold:
-                    recent_files.append(file_path)
-            except FileNotFoundError:
-                continue
-
-    recent_files.sort(key=lambda p: p.stat().st_mtime, reverse=True)
-    return recent_files
-
-def check_url_status(url):
-    """Checks if a URL is live and returns a 200 status code."""
-    try:
-        print(f"Checking URL: {url}")
-        response = requests.head(url, timeout=10, allow_redirects=True)
-        if response.status_code == 200:
-            print("✅ URL is live.")
-            return True
-        else:
-            print(f"⚠️ URL returned status code {response.status_code}.")
-            return False
-    except requests.RequestException as e:
-        print(f"❌ Could not connect to URL: {e}")
-        return False
+# One pooled session for every platform call, so requests to the same host
+# reuse the open TCP+TLS connection instead of handshaking each time.
+SESSION = requests.Session()
+SESSION.mount("https://", HTTPAdapter(
+    pool_connections=4,
+    pool_maxsize=4,
+    max_retries=POST_SAFE_RETRY, # Retries POSTs too, but only when a re-send can't double-post
+))
+
+# --- Precompiled Formatting Patterns ---
+# Compiled once at import so format_for_linkedin doesn't re-resolve patterns per call.
+TEMPLATE_RE = re.compile(r'\{\{.*?\}\}', re.IGNORECASE)
+CODE_FENCE_RE = re.compile(r'```[\s\S]*?```')
+HR_RE = re.compile(r'^\s*---\s*$', re.MULTILINE)
+TABLE_RE = re.compile(r'^\s*\|.*\|.*\n\s*\|[-|: ]+\|.*\n((?:\s*\|.*\|.*\n?)+)', re.MULTILINE)
+LINK_RE = re.compile(r'\[([^\]]+)\]\(([^)]+)\)') # Handles ')' in link text
+DAY_HEADING_RES = [
+    (re.compile(r'#+\s*📈\s*Markets Monday.*', re.IGNORECASE), '📈 Markets Monday'),
+    (re.compile(r'#+\s*🔥\s*Hot Takes Tuesday.*', re.IGNORECASE), '🔥 Hot Takes Tuesday'),
+    (re.compile(r'#+\s*🤪\s*Wacky Wednesday.*', re.IGNORECASE), '🤪 Wacky Wednesday'),
+    (re.compile(r'#+\s*🔙\s*Throwback Thursday.*', re.IGNORECASE), '🔙 Throwback Thursday'),
+    (re.compile(r'#+\s*✅\s*Final Thoughts Friday.*', re.IGNORECASE), '✅ Final Thoughts Friday'),
+    (re.compile(r'#+\s*🔮\s*Sneak Peak Saturday.*', re.IGNORECASE), '🔮 Sneak Peak Saturday'),
+]
+HEADING_RE = re.compile(r'^#+\s*(.+)$', re.MULTILINE)
+SENTENCE_RE = re.compile(r'([\.!\?])\s*([A-Z])')
+BOLD_RE = re.compile(r'(\*\*|__)')
+LIST_RE = re.compile(r'^\s*[\*\-]\s*', re.MULTILINE)
+BLANKS_RE = re.compile(r'\n{3,}')
 
 # --- Buttondown Functions ---
 
@@ -80,12 +67,12 @@ def post_to_buttondown(subject, body_content):
 
     headers = {"Authorization": f"Token {BUTTONDOWN_API_KEY}", "Content-Type": "application/json"}
     url = "https://api.buttondown.email/v1/emails"
-    editor_mode_comment = f"{BUTTONDOWN_EDIT}"
-    final_body = f"{editor_mode_comment}{body_content}"
+    editor_mode_comment = f"{BUTTONDOWN_EDIT}" if BUTTONDOWN_EDIT else ""
+    final_body = f"{editor_mode_comment}\n{body_content}"
     payload = {"subject": subject, "body": final_body, "status": "draft", "email_type": "premium"}
 
     try:
-        response = requests.post(url, headers=headers, json=payload)
+        response = SESSION.post(url, headers=headers, json=payload)
         if response.status_code == 201:
             print(f"✅ Successfully created draft in Buttondown.")
         else:
@@ -129,34 +116,29 @@ def format_for_linkedin(subject, description, markdown_content, url):
         return "\n".join(list_items) if list_items else ""
 
     text = text.replace('\\*', '*').replace('\\$', '$').replace('\\_', '_')
-    text = re.sub(r'\{\{.*?\}\}', '', text, flags=re.IGNORECASE)
-    text = re.sub(r'```[\s\S]*?```', '', text)
-    text = re.sub(r'^\s*---\s*$', '', text, flags=re.MULTILINE)
+    text = TEMPLATE_RE.sub('', text)
+    text = CODE_FENCE_RE.sub('', text)
+    text = HR_RE.sub('', text)
     
-    table_pattern = re.compile(r'^\s*\|.*\|.*\n\s*\|[-|: ]+\|.*\n((?:\s*\|.*\|.*\n?)+)', re.MULTILINE)
-    text = table_pattern.sub(convert_md_table_to_list, text)
+    text = TABLE_RE.sub(convert_md_table_to_list, text)
     
     # --- FIX 2: More robust regex for links. Handles ')' in link text. ---
-    text = re.sub(r'\[([^\]]+)\]\(([^)]+)\)', link_to_footnote, text)
+    text = LINK_RE.sub(link_to_footnote, text)
     
     # Clean up daily-themed headings (adjust patterns as needed)
-    text = re.sub(r'#+\s*📈\s*Markets Monday.*', '📈 Markets Monday', text, flags=re.IGNORECASE)
-    text = re.sub(r'#+\s*🔥\s*Hot Takes Tuesday.*', '🔥 Hot Takes Tuesday', text, flags=re.IGNORECASE)
-    text = re.sub(r'#+\s*🤪\s*Wacky Wednesday.*', '🤪 Wacky Wednesday', text, flags=re.IGNORECASE)
-    text = re.sub(r'#+\s*🔙\s*Throwback Thursday.*', '🔙 Throwback Thursday', text, flags=re.IGNORECASE)
-    text = re.sub(r'#+\s*✅\s*Final Thoughts Friday.*', '✅ Final Thoughts Friday', text, flags=re.IGNORECASE)
-    text = re.sub(r'#+\s*🔮\s*Sneak Peak Saturday.*', '🔮 Sneak Peak Saturday', text, flags=re.IGNORECASE)
+    for day_re, day_header in DAY_HEADING_RES:
+        text = day_re.sub(day_header, text)
 
     # --- FIX 3: Better heading formatting to add spacing (from linkedin_sync.py) ---
-    text = re.sub(r'^#+\s*(.+)$', r'\n\n\1\n', text, flags=re.MULTILINE)
+    text = HEADING_RE.sub(r'\n\n\1\n', text)
     
-    text = re.sub(r'([\.!\?])\s*([A-Z])', r'\1\n\n\2', text) # Add paragraph breaks
-    text = re.sub(r'(\*\*|__)', '', text) # Remove bold/italic
+    text = SENTENCE_RE.sub(r'\1\n\n\2', text) # Add paragraph breaks
+    text = BOLD_RE.sub('', text) # Remove bold/italic
     
     # --- FIX 4: Convert bullet points (this should work correctly now) ---
-    text = re.sub(r'^\s*[\*\-]\s*', '• ', text, flags=re.MULTILINE)
+    text = LIST_RE.sub('• ', text)
     
-    text = re.sub(r'\n{3,}', '\n\n', text).strip() # Clean up extra newlines
+    text = BLANKS_RE.sub('\n\n', text).strip() # Clean up extra newlines
 
     footnote_section = ""
     if footnotes:
@@ -191,7 +173,7 @@ def post_to_linkedin(post_content):
         "visibility": {"com.linkedin.ugc.MemberNetworkVisibility": "PUBLIC"}
     }
     try:
-        response = requests.post("https://api.linkedin.com/v2/ugcPosts", headers=headers, json=post_data)
+        response = SESSION.post("https://api.linkedin.com/v2/ugcPosts", headers=headers, json=post_data)
         response.raise_for_status()
         print("✅ Successfully posted to LinkedIn!")
     except requests.exceptions.RequestException as e:
@@ -202,9 +184,7 @@ def post_to_linkedin(post_content):
 # --- RESTORED: Original simple formatting for GoToSocial ---
 def format_for_gotosocial(subject, markdown_content, url):
     """Converts markdown content to a GoToSocial-friendly plain text format."""
-    paragraphs = markdown_content.split('\n\n')
-    text = '\n\n'.join(paragraphs)
-    return f"{subject}\n\n{text}\n\nRead the full post here: {url}"
+    return f"{subject}\n\n{markdown_content}\n\nRead the full post here: {url}"
 
 
 def post_to_gotosocial(post_content):
@@ -219,121 +199,57 @@ def post_to_gotosocial(post_content):
     post_data = {"status": post_content, "visibility": "public"}
 
     try:
-        response = requests.post(post_url, headers=headers, json=post_data)
+        response = SESSION.post(post_url, headers=headers, json=post_data)
         response.raise_for_status()
         print("✅ Successfully posted to GoToSocial!")
     except requests.exceptions.RequestException as e:
         print(f"❌ Error posting to GoToSocial: {e}\n   Response: {e.response.text}")
 
 
+# --- Platform Handlers ---
+# Each one previews the post, asks for confirmation, and returns the function that
+# publishes it (or None if cancelled); see modules.workflow.run_publish_workflow.
+
+def prepare_buttondown(post, cleanup):
+    # post_to_buttondown adds the editor-mode comment itself, so the body is built once.
+    body_for_buttondown = post["markdown_content"] # Use raw markdown content
+    print_dry_run("Buttondown",
+                  f"Subject: {post['subject']}",
+                  f"Body (first 200 chars): {body_for_buttondown.strip()[:200]}...")
+    if not confirm("Do you want to create this draft in Buttondown?"):
+        print("\nPublishing to Buttondown cancelled.")
+        return None
+    return lambda: post_to_buttondown(post["subject"], body_for_buttondown)
+
+def prepare_linkedin(post, cleanup):
+    # --- CORRECTED: Call the new, specific LinkedIn formatter ---
+    linkedin_post = format_for_linkedin(post["subject"], post["description"], post["markdown_content"], post["full_url"])
+    print_dry_run("LinkedIn", linkedin_post)
+    if not confirm("Do you want to publish this to LinkedIn?"):
+        print("\nPublishing to LinkedIn cancelled.")
+        return None
+    return lambda: post_to_linkedin(linkedin_post)
+
+def prepare_gotosocial(post, cleanup):
+    # --- CORRECTED: Call the original, simple GoToSocial formatter ---
+    gotosocial_post = format_for_gotosocial(post["subject"], post["markdown_content"], post["full_url"])
+    print_dry_run("GoToSocial", gotosocial_post)
+    if not confirm("Do you want to publish this to GoToSocial?"):
+        print("\nPublishing to GoToSocial cancelled.")
+        return None
+    return lambda: post_to_gotosocial(gotosocial_post)
+
+PLATFORMS = {
+    "1": ("Buttondown", prepare_buttondown),
+    "2": ("LinkedIn", prepare_linkedin),
+    "3": ("GoToSocial", prepare_gotosocial),
+}
+
 # --- Main Execution ---
 
 def main():
     """Main function to orchestrate the publishing workflow."""
-    # ... (The first part of the main function is unchanged) ...
-    print("--- Unified Social Publishing Sync ---")
-    recent_files = find_recent_markdown_files(SYNC_PATH_STR)
-
-    if not recent_files:
-        print("No recent markdown files found in 'hot-fudge-daily' to sync.")
-        return
-
-    print("\n--- Recent Markdown Files (Last 7 Days) ---")
-    for i, file_path in enumerate(recent_files):
-        print(f"  {i + 1}. {file_path.name}")
-    print("-" * 30)
-
-    try:
-        choice = input("Enter the number of the file to publish: ").strip()
-        index = int(choice) - 1
-        if not (0 <= index < len(recent_files)):
-            raise ValueError("Invalid number.")
-        file_to_post = recent_files[index]
-    except (ValueError, IndexError):
-        print("❌ Invalid selection. Exiting.")
-        return
-
-    try:
-        post = frontmatter.load(file_to_post)
-        subject = post.metadata.get('title', 'No Subject')
-        description = post.metadata.get('description', '')
-        permalink = post.metadata.get('permalink', '')
-        markdown_content = post.content
-
-        if not permalink:
-            print("❌ 'permalink' not found in frontmatter. Cannot verify URL.")
-            return
-
-        full_url = urljoin(SITE_BASE_URL, permalink)
-
-        if not check_url_status(full_url):
-            print("Post is not live yet. Please deploy your site and try again.")
-            return
-
-    except Exception as e:
-        print(f"Error reading or parsing the markdown file {file_to_post}: {e}")
-        return
-
-    print("\nWhich platforms do you want to post to?")
-    print("  1. Buttondown")
-    print("  2. LinkedIn")
-    print("  3. GoToSocial")
-    print("  4. All of the above")
-    platform_choice = input("Enter your choice (e.g., '1,3' or '4'): ").strip().lower()
-
-    if not platform_choice:
-        print("No platforms selected. Exiting.")
-        return
-
-    do_buttondown = '1' in platform_choice or '4' in platform_choice
-    do_linkedin = '2' in platform_choice or '4' in platform_choice
-    do_gotosocial = '3' in platform_choice or '4' in platform_choice
-
-    if do_buttondown:
-        # ... (Buttondown logic is unchanged) ...
-        editor_mode_comment = f"{BUTTONDOWN_EDIT}"
-        body_for_buttondown = f"{editor_mode_comment}\n{markdown_content}"
-        print("\n" + "="*50)
-        print("                DRY RUN for Buttondown")
-        print("="*50 + "\n")
-        print(f"Subject: {subject}")
-        print(f"Body (first 200 chars): {body_for_buttondown.strip()[:200]}...")
-        print("\n" + "="*50)
-        publish_choice = input(f"Do you want to create this draft in Buttondown? (y/N): ").lower()
-        if publish_choice == 'y':
-            post_to_buttondown(subject, body_for_buttondown)
-        else:
-            print("\nPublishing to Buttondown cancelled.")
-
-    if do_linkedin:
-        # --- CORRECTED: Call the new, specific LinkedIn formatter ---
-        linkedin_post = format_for_linkedin(subject, description, markdown_content, full_url)
-        print("\n" + "="*50)
-        print("                DRY RUN for LinkedIn")
-        print("="*50 + "\n")
-        print(linkedin_post)
-        print("\n" + "="*50)
-        publish_choice = input(f"Do you want to publish this to LinkedIn? (y/N): ").lower()
-        if publish_choice == 'y':
-            post_to_linkedin(linkedin_post)
-        else:
-            print("\nPublishing to LinkedIn cancelled.")
-
-    if do_gotosocial:
-        # --- CORRECTED: Call the original, simple GoToSocial formatter ---
-        gotosocial_post = format_for_gotosocial(subject, markdown_content, full_url)
-        print("\n" + "="*50)
-        print("                DRY RUN for GoToSocial")
-        print("="*50 + "\n")
-        print(gotosocial_post)
-        print("\n" + "="*50)
-        publish_choice = input(f"Do you want to publish this to GoToSocial? (y/N): ").lower()
-        if publish_choice == 'y':
-            post_to_gotosocial(gotosocial_post)
-        else:
-            print("\nPublishing to GoToSocial cancelled.")
-
-    print("\n--- Sync Complete ---")
+    run_publish_workflow(PLATFORMS, SYNC_PATH_STR, SITE_BASE_URL, default_title='No Subject')
 
 if __name__ == "__main__":
     main()
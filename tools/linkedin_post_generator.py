@@ -1,8 +1,19 @@
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 import json
+try:
+    # orjson parses the raw response bytes in C; fall back to the stdlib if absent.
+    import orjson
+    json_loads = orjson.loads
+except ImportError:
+    json_loads = json.loads
 from dotenv import load_dotenv
 import os
+import sys
 import google.generativeai as genai
+import hashlib
+from pathlib import Path
 from datetime import datetime, timedelta, timezone
 
 # Load environment variables from .env file
@@ -16,6 +27,19 @@ if not BUTTONDOWN_API_KEY:
 BUTTONDOWN_BASE_URL = "https://api.buttondown.email"
 BUTTONDOWN_ENDPOINT = "/emails"
 
+# One pooled session for every Buttondown call so repeat requests reuse the
+# same TCP+TLS connection instead of handshaking each time.
+SESSION = requests.Session()
+SESSION.mount("https://", HTTPAdapter(
+    pool_connections=4,
+    pool_maxsize=4,
+    max_retries=Retry(total=3, backoff_factor=0.3, status_forcelist=(429, 500, 502, 503, 504)),
+))
+SESSION.headers.update({
+    "Authorization": f"Token {BUTTONDOWN_API_KEY}",
+    "Accept": "application/json",
+})
+
 # --- Google Gemini API Configuration ---
 GOOGLE_API_KEY = os.getenv("GOOGLE_API_KEY")
 if not GOOGLE_API_KEY:
@@ -24,47 +48,99 @@ if not GOOGLE_API_KEY:
 genai.configure(api_key=GOOGLE_API_KEY)
 model = genai.GenerativeModel('gemini-2.5-pro')
 
+# --- Gemini Response Cache ---
+# Summaries are cached on disk keyed by a hash of the prompt inputs, so re-running
+# the script for the same email skips the paid Gemini call entirely.
+# Bump PROMPT_VERSION whenever the prompt text changes to invalidate old entries.
+PROMPT_VERSION = "1"
+GEMINI_CACHE_DIR = Path(".gemini_cache")
+# Bodies shorter than this aren't worth a (slow, paid) summarization call.
+MIN_BODY_LENGTH = 200
+
+# --- Buttondown Response Cache ---
+# The last response for each URL is kept on disk with its ETag/Last-Modified so a
+# quick re-run can send a conditional request and get a bodyless 304 back.
+BUTTONDOWN_CACHE_DIR = Path(".buttondown_cache")
+
+def get_buttondown_json(url):
+    """
+    GETs a Buttondown URL and returns the decoded JSON, revalidating against the
+    on-disk copy with If-None-Match/If-Modified-Since when one exists.
+    """
+    cache_file = BUTTONDOWN_CACHE_DIR / f"{hashlib.sha256(url.encode('utf-8')).hexdigest()}.json"
+    cached = None
+    headers = {}
+    if cache_file.exists():
+        try:
+            cached = json_loads(cache_file.read_bytes())
+            if cached.get("etag"):
+                headers["If-None-Match"] = cached["etag"]
+            if cached.get("last_modified"):
+                headers["If-Modified-Since"] = cached["last_modified"]
+        except (OSError, ValueError):
+            cached = None
+
+    response = SESSION.get(url, headers=headers)
+    if response.status_code == 304 and cached is not None:
+        print("Buttondown response not modified; using cached copy.")
+        return cached["data"]
+    response.raise_for_status()  # Raise an exception for HTTP errors
+    data = json_loads(response.content)
+
+    etag = response.headers.get("ETag")
+    last_modified = response.headers.get("Last-Modified")
+    if etag or last_modified:
+        try:
+            BUTTONDOWN_CACHE_DIR.mkdir(exist_ok=True)
+            cache_file.write_text(
+                json.dumps({"etag": etag, "last_modified": last_modified, "data": data}),
+                encoding="utf-8",
+            )
+        except OSError as e:
+            print(f"Warning: Could not write Buttondown cache file {cache_file}: {e}")
+    return data
+
 def get_latest_sunday_buttondown_email():
     """
     Fetches the most recent public email from Buttondown that was published on a Sunday.
-    This version filters by a date range to ensure we capture the most recent Sunday.
+    The newest public email is fetched alone first; only when it isn't a Sunday email
+    does this fall back to scanning the last 14 days, newest first.
     """
-    headers = {
-        "Authorization": f"Token {BUTTONDOWN_API_KEY}",
-    }
-    
-    # Calculate the date 14 days ago to ensure we capture at least two weeks of emails.
-    two_weeks_ago = datetime.now(timezone.utc) - timedelta(days=7)
-    
-    # Format the date into a simple YYYY-MM-DD format.
-    formatted_date = two_weeks_ago.strftime('%Y-%m-%d')
-    
-    # Use the publish_date__start filter to get all emails published in the last 14 days.
-    FILTERS = f"?ordering=-publish_date&type=public&publish_date__start={formatted_date}"
-
-    try:
-        print("Fetching recent public emails from Buttondown (last 14 days)...")
-        response = requests.get(f"{BUTTONDOWN_BASE_URL}/v1{BUTTONDOWN_ENDPOINT}{FILTERS}", headers=headers)
-        response.raise_for_status()  # Raise an exception for HTTP errors
-        data = json.loads(response.content)
-        emails = data.get("results", [])
-
-        if not emails:
-            print("No emails found from Buttondown API in the specified date range.")
-            return None
-
-        # Iterate through the fetched emails to find the most recent one published on a Sunday.
+    def latest_sunday_email(emails):
+        # Emails arrive newest first, so the first Sunday one is the latest.
         for email in emails:
             publish_date_str = email.get('publish_date')
             if publish_date_str:
                 # The 'Z' at the end of the timestamp indicates UTC. `fromisoformat` can handle this.
                 publish_date = datetime.fromisoformat(publish_date_str.replace('Z', '+00:00'))
-                
+
                 # Check if the day of the week is Sunday.
                 # Monday is 0 and Sunday is 6.
                 if publish_date.weekday() == 6:
                     print(f"Found latest Sunday email published on {publish_date.date()}.")
                     return email
+        return None
+
+    # Both requests share the 14-day window, so an old Sunday issue is never returned
+    # as the latest one when nothing has gone out recently.
+    two_weeks_ago = (datetime.now(timezone.utc) - timedelta(days=14)).strftime('%Y-%m-%d')
+    FILTERS = f"?ordering=-publish_date&type=public&publish_date__start={two_weeks_ago}"
+
+    try:
+        # Fast path: the Sunday email is usually the newest one, so ask for just that.
+        print("Fetching the latest public email from Buttondown...")
+        data = get_buttondown_json(f"{BUTTONDOWN_BASE_URL}/v1{BUTTONDOWN_ENDPOINT}{FILTERS}&page_size=1")
+        email = latest_sunday_email(data.get("results", []))
+        if email:
+            return email
+
+        # Fallback: something went out after Sunday (or last Sunday had nothing), so scan
+        # the last two weeks newest first for the latest Sunday email.
+        print("Latest email isn't a Sunday one; scanning public emails from the last 14 days...")
+        data = get_buttondown_json(f"{BUTTONDOWN_BASE_URL}/v1{BUTTONDOWN_ENDPOINT}{FILTERS}")
+        email = latest_sunday_email(data.get("results", []))
+        if email:
+            return email
 
         print("No Sunday email found in the recent batch of emails.")
         return None
@@ -80,7 +156,18 @@ def summarize_with_gemini(email_subject, email_body, email_url):
     """
     Uses Google Gemini to summarize the email content for LinkedIn,
     retaining writing style and adhering to LinkedIn repackaging strategy.
+    Responses are cached on disk by a hash of the subject, body, and URL.
+    The summary is written to stdout as it arrives, then returned in full.
     """
+    cache_key = hashlib.sha256(
+        f"{PROMPT_VERSION}|{email_subject}|{email_body}|{email_url}".encode("utf-8")
+    ).hexdigest()
+    cache_file = GEMINI_CACHE_DIR / f"{cache_key}.txt"
+    if cache_file.exists():
+        summary = cache_file.read_text(encoding="utf-8")
+        print(summary)
+        return summary
+
     prompt = f"""
     You are an expert content repackager for LinkedIn. Your task is to summarize the following email content for a LinkedIn post.
     The summary needs to be engaging, value-driven, and adhere to the "Repackage and React Strategy" for LinkedIn.
@@ -110,31 +197,48 @@ def summarize_with_gemini(email_subject, email_body, email_url):
     Please provide a copy-paste ready LinkedIn post based on the above guidelines.
     """
     try:
-        response = model.generate_content(prompt)
-        # Access the text from the GenerateContentResponse object
-        return response.text
+        # Stream the response so the post starts printing at the first token
+        # instead of after the whole generation finishes.
+        parts = []
+        for chunk in model.generate_content(prompt, stream=True):
+            parts.append(chunk.text)
+            sys.stdout.write(chunk.text)
+            sys.stdout.flush()
+        print()
+        summary = "".join(parts)
     except Exception as e:
         print(f"Error generating summary with Gemini: {e}")
         return "Could not generate summary."
 
+    try:
+        GEMINI_CACHE_DIR.mkdir(exist_ok=True)
+        cache_file.write_text(summary, encoding="utf-8")
+    except OSError as e:
+        print(f"Warning: Could not write Gemini cache file {cache_file}: {e}")
+    return summary
+
 def main():
     latest_email = get_latest_sunday_buttondown_email()
 
     if latest_email:
         subject = latest_email.get('subject', 'No Subject')
-        body = latest_email.get('body', 'No Body Content')
+        body = latest_email.get('body') or '' # The API can send "body": null
         email_url = latest_email.get('absolute_url', '#') 
 
+        # Don't pay for a Gemini call when there's nothing worth summarizing.
+        if len(body.strip()) < MIN_BODY_LENGTH:
+            print("Email body is empty or too short; skipping Gemini summarization.")
+            return
+
         print("-" * 50)
         print("Generating LinkedIn Post for the Latest Sunday Email...")
         print("-" * 50)
 
-        linkedin_summary = summarize_with_gemini(subject, body, email_url)
-
         print("\n" * 2)
         print("Copy-Paste Ready LinkedIn Post:")
         print("=" * 30)
-        print(linkedin_summary)
+        # The summary prints itself as it streams in below the banner.
+        summarize_with_gemini(subject, body, email_url)
         print("\n")
         print(f"Read the full email here: {email_url}")
         print("=" * 30)
@@ -1,7 +1,19 @@
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 import json
+try:
+    # orjson parses the raw response bytes in C; fall back to the stdlib if absent.
+    import orjson
+    json_loads = orjson.loads
+    json_dumps = orjson.dumps
+except ImportError:
+    json_loads = json.loads
+    json_dumps = lambda obj: json.dumps(obj).encode("utf-8")
 from dotenv import load_dotenv
 import os
+import hashlib
+from pathlib import Path
 from datetime import datetime, timedelta, timezone
 import re
 from markdownify import markdownify as md
@@ -19,6 +31,58 @@ LINKEDIN_AUTHOR = os.getenv("LINKEDIN_AUTHOR")  # e.g., "urn:li:person:xxxxxxxx"
 if not all([BUTTONDOWN_API_KEY, LINKEDIN_ACCESS_TOKEN, LINKEDIN_AUTHOR]):
     raise ValueError("One or more required environment variables are missing in your .env file.")
 
+# --- Shared HTTP Session ---
+# Buttondown and LinkedIn calls share one pooled session so each host keeps a
+# warm connection. POSTs are not retried by urllib3's default Retry policy.
+SESSION = requests.Session()
+SESSION.mount("https://", HTTPAdapter(
+    pool_connections=4,
+    pool_maxsize=4,
+    max_retries=Retry(total=3, backoff_factor=0.3, status_forcelist=(429, 500, 502, 503, 504)),
+))
+SESSION.headers["Accept"] = "application/json"
+
+# --- Precompiled Formatting Patterns ---
+# Compiled once at import so format_for_linkedin doesn't re-resolve patterns per call.
+DAY_HEADERS = {
+    "markets monday": "📈 Markets Monday",
+    "hot takes tuesday": "🔥 Hot Takes Tuesday",
+    "wacky wednesday": "🤪 Wacky Wednesday",
+    "throwback thursday": "🔙 Throwback Thursday",
+    "final thoughts friday": "✅ Final Thoughts Friday",
+    "sneak peak saturday": "🔮 Sneak Peak Saturday",
+}
+# One alternation replaces the six per-day substitutions (one scan instead of six).
+DAY_RE = re.compile(
+    r'#+\s*(?:📈|🔥|🤪|🔙|✅|🔮)\s*'
+    r'(Markets Monday|Hot Takes Tuesday|Wacky Wednesday|Throwback Thursday|Final Thoughts Friday|Sneak Peak Saturday).*',
+    re.IGNORECASE,
+)
+TEMPLATE_RE = re.compile(r'\{\{.*?\}\}', re.IGNORECASE)
+TABLE_RE = re.compile(r'^\s*\|.*\|.*\n\s*\|[-|: ]+\|.*\n((?:\s*\|.*\|.*\n?)+)', re.MULTILINE)
+SYMBOL_RE = re.compile(r'\[(.*?)\]')
+# Ticker bullets ("* [SYM](url) (Company): **+1%**") are rewritten in their own pass
+# before links: a link can open before a bullet or sit in its company text, and only
+# a second scan over the rewritten bullets turns those into footnotes.
+TICKER_RE = re.compile(r'\*\s*\[.*?\]\(.*?\)\s*\((.*?)\):\s*\*\*(.*?)\*\*')
+LINK_RE = re.compile(r'\[(.*?)\]\((.*?)\)')
+BOLD_RE = re.compile(r'(\*\*|__)')
+LIST_RE = re.compile(r'^\s*[\*\-]\s*', re.MULTILINE)
+HEADING_RE = re.compile(r'^#+\s*(.+)$', re.MULTILINE)
+SENTENCE_RE = re.compile(r'([\.!\?])\s*([A-Z])')
+STRAY_HASH_RE = re.compile(r'#+\s*')
+BLANKS_RE = re.compile(r'\n{3,}')
+BARE_URL_LINE_RE = re.compile(r'^(https?://[^\s]+)\s*$', re.MULTILINE)
+HR_RE = re.compile(r'^\s*---\s*$', re.MULTILINE)
+CODE_FENCE_RE = re.compile(r'```.*?```', re.DOTALL)
+
+# --- Formatted Post Cache ---
+# format_for_linkedin is a pure function of its inputs, so a preview/cancel/re-run
+# reads the finished post back from disk instead of redoing the markdown pipeline.
+# Bump FORMAT_VERSION whenever the formatting rules change to invalidate old entries.
+FORMAT_VERSION = "3"
+FORMAT_CACHE_DIR = Path(".linkedin_format_cache")
+
 def get_weekly_emails_and_prompt():
     """
     Fetches all public emails from the last 7 days and prompts the user to select one.
@@ -33,9 +97,9 @@ def get_weekly_emails_and_prompt():
 
     try:
         print(f"▶️ Fetching emails since {start_date_str} from Buttondown...")
-        response = requests.get(url, headers=headers)
+        response = SESSION.get(url, headers=headers)
         response.raise_for_status()
-        emails = response.json().get("results", [])
+        emails = json_loads(response.content).get("results", [])
 
         if not emails:
             print("⏹️ No emails found in the last 7 days.")
@@ -67,68 +131,85 @@ def get_weekly_emails_and_prompt():
         return None
 
 
+def strip_block_noise(text):
+    """
+    Removes bare-URL lines, horizontal rules and fenced code blocks, in that order.
+    These stay regexes: fences can open or close mid-line, and the rule/URL patterns
+    also swallow neighbouring whitespace-only lines, which a line walk can't mirror.
+    """
+    text = BARE_URL_LINE_RE.sub('', text)
+    text = HR_RE.sub('', text)
+    return CODE_FENCE_RE.sub('', text)
+
+
 def format_for_linkedin(subject, description, html_body, url):
     """
     Converts email HTML to a LinkedIn-friendly plain text format with footnote-style links.
+    Results are cached on disk by a hash of the inputs.
     """
+    cache_key = hashlib.blake2b(
+        f"{FORMAT_VERSION}|{subject}|{description}|{html_body}|{url}".encode("utf-8"),
+        digest_size=16,
+    ).hexdigest()
+    cache_file = FORMAT_CACHE_DIR / f"{cache_key}.txt"
+    if cache_file.exists():
+        return cache_file.read_text(encoding="utf-8")
 
     footnotes = []
     def link_to_footnote(match):
-        link_text = match.group(1)
-        link_url = match.group(2)
-        footnotes.append(link_url)
-        return f"{link_text} [{len(footnotes)}]"
+        footnotes.append(match.group(2))
+        return f"{match.group(1)} [{len(footnotes)}]"
 
     def convert_md_table_to_list(match):
         table_text = match.group(0)
         lines = table_text.strip().split('\n')
         if len(lines) < 3: return table_text
 
-        list_items = []
-        for row in lines[2:]:
-            columns = [col.strip() for col in row.split('|') if col.strip()]
-            if len(columns) >= 3:
-                symbol_match = re.search(r'\[(.*?)\]', columns[0])
-                symbol = symbol_match.group(1) if symbol_match else columns[0]
-                company = columns[1]
-                change = columns[2]
-                list_items.append(f"• {symbol} ({company}): {change}")
-        return "\n".join(list_items)
+        def row_to_item(row):
+            # Strip each cell once instead of once for the test and again for the value.
+            columns = [col for col in map(str.strip, row.split('|')) if col]
+            if len(columns) < 3:
+                return None
+            symbol_match = SYMBOL_RE.search(columns[0])
+            symbol = symbol_match.group(1) if symbol_match else columns[0]
+            return f"• {symbol} ({columns[1]}): {columns[2]}"
+
+        return "\n".join(item for item in map(row_to_item, lines[2:]) if item)
 
-    text = md(html_body, heading_style="ATX")
+    # Skip markdownify's per-text-node escaping; the replaces below only need to
+    # undo backslash escapes already present in markdown-authored bodies.
+    text = md(
+        html_body,
+        heading_style="ATX",
+        escape_asterisks=False,
+        escape_underscores=False,
+        escape_misc=False,
+    )
 
     text = text.replace('\\*', '*')
     text = text.replace('\\$', '$')
     text = text.replace('\\_', '_')
+
+    text = TEMPLATE_RE.sub('', text)
+    text = strip_block_noise(text)
     
-    text = re.sub(r'\{\{.*?\}\}', '', text, flags=re.IGNORECASE)
-    text = re.sub(r'^(https?://[^\s]+)\s*$', '', text, flags=re.MULTILINE)
-    text = re.sub(r'^\s*---\s*$', '', text, flags=re.MULTILINE)
-    text = re.sub(r'```[\s\S]*?```', '', text)
-    
-    table_pattern = re.compile(r'^\s*\|.*\|.*\n\s*\|[-|: ]+\|.*\n((?:\s*\|.*\|.*\n?)+)', re.MULTILINE)
-    text = table_pattern.sub(convert_md_table_to_list, text)
+    text = TABLE_RE.sub(convert_md_table_to_list, text)
     
-    text = re.sub(r'\*\s*\[.*?\]\(.*?\)\s*\((.*?)\):\s*\*\*(.*?)\*\*', r'• \1: \2', text)
-    text = re.sub(r'\[(.*?)\]\((.*?)\)', link_to_footnote, text)
+    text = TICKER_RE.sub(r'• \1: \2', text)
+    text = LINK_RE.sub(link_to_footnote, text)
     
-    text = re.sub(r'#+\s*📈\s*Markets Monday.*', '📈 Markets Monday', text, flags=re.IGNORECASE)
-    text = re.sub(r'#+\s*🔥\s*Hot Takes Tuesday.*', '🔥 Hot Takes Tuesday', text, flags=re.IGNORECASE)
-    text = re.sub(r'#+\s*🤪\s*Wacky Wednesday.*', '🤪 Wacky Wednesday', text, flags=re.IGNORECASE)
-    text = re.sub(r'#+\s*🔙\s*Throwback Thursday.*', '🔙 Throwback Thursday', text, flags=re.IGNORECASE)
-    text = re.sub(r'#+\s*✅\s*Final Thoughts Friday.*', '✅ Final Thoughts Friday', text, flags=re.IGNORECASE)
-    text = re.sub(r'#+\s*🔮\s*Sneak Peak Saturday.*', '🔮 Sneak Peak Saturday', text, flags=re.IGNORECASE)
+    text = DAY_RE.sub(lambda m: DAY_HEADERS[m.group(1).lower()], text)
     
-    text = re.sub(r'^#+\s*(.+)$', r'\n\n\1\n', text, flags=re.MULTILINE)
+    text = HEADING_RE.sub(r'\n\n\1\n', text)
     
     # --- THE FIX IS HERE ---
     # Intelligently add paragraph breaks after a sentence ends and a new one begins.
-    text = re.sub(r'([\.!\?])\s*([A-Z])', r'\1\n\n\2', text)
+    text = SENTENCE_RE.sub(r'\1\n\n\2', text)
 
-    text = re.sub(r'(\*\*|__)', '', text)
-    text = re.sub(r'^\s*[\*\-]\s*', '• ', text, flags=re.MULTILINE)
-    text = re.sub(r'#+\s*', '', text)
-    text = re.sub(r'\n{3,}', '\n\n', text).strip()
+    text = BOLD_RE.sub('', text)
+    text = LIST_RE.sub('• ', text)
+    text = STRAY_HASH_RE.sub('', text)
+    text = BLANKS_RE.sub('\n\n', text).strip()
 
     footnote_section = ""
     if footnotes:
@@ -136,6 +217,12 @@ def format_for_linkedin(subject, description, html_body, url):
         footnote_section = "\n\n" + "\n".join(footnote_lines)
 
     full_post = f"{subject}\n\n{description}\n\n{text}{footnote_section}\n\nRead the full post here: {url}"
+
+    try:
+        FORMAT_CACHE_DIR.mkdir(exist_ok=True)
+        cache_file.write_text(full_post, encoding="utf-8")
+    except OSError as e:
+        print(f"⚠️ Could not write format cache file {cache_file}: {e}")
     return full_post
 
 
@@ -162,7 +249,7 @@ def post_to_linkedin(post_content):
         }
     }
     try:
-        response = requests.post("https://api.linkedin.com/v2/ugcPosts", headers=headers, json=post_data)
+        response = SESSION.post("https://api.linkedin.com/v2/ugcPosts", headers=headers, data=json_dumps(post_data))
         response.raise_for_status()
         print("\n✅ Successfully posted to LinkedIn!")
     except requests.exceptions.RequestException as e:
@@ -1,7 +1,20 @@
 from pathlib import Path # --- NEW ---
+import functools
 import glob
+import hashlib
+import shutil
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 import json
+try:
+    # orjson parses the raw response bytes in C; fall back to the stdlib if absent.
+    import orjson
+    json_loads = orjson.loads
+    json_dumps = orjson.dumps
+except ImportError:
+    json_loads = json.loads
+    json_dumps = lambda obj: json.dumps(obj).encode("utf-8")
 from dotenv import load_dotenv
 import os
 from datetime import datetime, timedelta, timezone
@@ -31,6 +44,65 @@ LINKEDIN_AUTHOR = os.getenv("LINKEDIN_AUTHOR")  # e.g., "urn:li:person:xxxxxxxx"
 if not all([BUTTONDOWN_API_KEY, LINKEDIN_ACCESS_TOKEN, LINKEDIN_AUTHOR]):
     raise ValueError("One or more required environment variables are missing in your .env file.")
 
+# --- Publish Date Helpers ---
+# Buttondown timestamps look like '2024-01-15T10:00:00Z'. Python 3.11+ parses the
+# trailing 'Z' natively, so the version check happens once here, not per email.
+if sys.version_info >= (3, 11):
+    parse_publish_date = datetime.fromisoformat
+else:
+    def parse_publish_date(value):
+        return datetime.fromisoformat(value.replace('Z', '+00:00'))
+
+WEEKDAY_ABBR = ('Mon', 'Tue', 'Wed', 'Thu', 'Fri', 'Sat', 'Sun')
+
+def format_publish_date(value):
+    """Formats a Buttondown timestamp as 'YYYY-MM-DD (Day)' for the selection menu."""
+    return f"{value[:10]} ({WEEKDAY_ABBR[parse_publish_date(value).weekday()]})"
+
+# --- Shared HTTP Session ---
+# Buttondown and LinkedIn calls (including the register/upload/publish media steps)
+# share one pooled session so each host keeps a warm connection.
+# POSTs and PUTs are not retried by urllib3's default Retry policy.
+SESSION = requests.Session()
+SESSION.mount("https://", HTTPAdapter(
+    pool_connections=4,
+    pool_maxsize=4,
+    max_retries=Retry(total=3, backoff_factor=0.3, status_forcelist=(429, 500, 502, 503, 504)),
+))
+
+# --- Precompiled Formatting Patterns ---
+# Compiled once at import so format_for_linkedin doesn't re-resolve patterns per call.
+TEMPLATE_RE = re.compile(r'\{\{.*?\}\}', re.IGNORECASE)
+BARE_URL_RE = re.compile(r'^(https?://[^\s]+)\s*$', re.MULTILINE)
+HR_RE = re.compile(r'^\s*---\s*$', re.MULTILINE)
+CODE_FENCE_RE = re.compile(r'```[\s\S]*?```')
+TABLE_RE = re.compile(r'^\s*\|.*\|.*\n\s*\|[-|: ]+\|.*\n((?:\s*\|.*\|.*\n?)+)', re.MULTILINE)
+SYMBOL_RE = re.compile(r'\[(.*?)\]')
+# Ticker bullets ("* [SYM](url) (Company): **+1%**") are rewritten in their own pass
+# before links: a link can open before a bullet or sit in its company text, and only
+# a second scan over the rewritten bullets turns those into footnotes.
+TICKER_RE = re.compile(r'\*\s*\[.*?\]\(.*?\)\s*\((.*?)\):\s*\*\*(.*?)\*\*')
+LINK_RE = re.compile(r'\[(.*?)\]\((.*?)\)')
+DAY_HEADERS = {
+    "markets monday": "📈 Markets Monday",
+    "hot takes tuesday": "🔥 Hot Takes Tuesday",
+    "wacky wednesday": "🤪 Wacky Wednesday",
+    "throwback thursday": "🔙 Throwback Thursday",
+    "final thoughts friday": "✅ Final Thoughts Friday",
+    "sneak peak saturday": "🔮 Sneak Peak Saturday",
+}
+# One alternation replaces the six per-day substitutions (one scan instead of six).
+DAY_RE = re.compile(
+    r'#+\s*(?:📈|🔥|🤪|🔙|✅|🔮)\s*'
+    r'(Markets Monday|Hot Takes Tuesday|Wacky Wednesday|Throwback Thursday|Final Thoughts Friday|Sneak Peak Saturday).*',
+    re.IGNORECASE,
+)
+HEADING_RE = re.compile(r'^#+\s*(.+)$', re.MULTILINE)
+SENTENCE_RE = re.compile(r'([\.!\?])\s*([A-Z])')
+LIST_RE = re.compile(r'^\s*[\*\-]\s*', re.MULTILINE)
+STRAY_HASH_RE = re.compile(r'#+\s*')
+BLANKS_RE = re.compile(r'\n{3,}')
+
 # --- (Your existing get_weekly_emails_and_prompt function) ---
 def get_weekly_emails_and_prompt():
     """
@@ -46,9 +118,9 @@ def get_weekly_emails_and_prompt():
 
     try:
         print(f"▶️ Fetching emails since {start_date_str} from Buttondown...")
-        response = requests.get(url, headers=headers)
+        response = SESSION.get(url, headers=headers)
         response.raise_for_status()
-        emails = response.json().get("results", [])
+        emails = json_loads(response.content).get("results", [])
 
         if not emails:
             print("⏹️ No emails found in the last 7 days.")
@@ -56,8 +128,7 @@ def get_weekly_emails_and_prompt():
 
         print("\n--- Emails Found in the Last 7 Days ---")
         for i, email in enumerate(emails):
-            publish_date = datetime.fromisoformat(email['publish_date'].replace('Z', '+00:00'))
-            date_display = publish_date.strftime('%Y-%m-%d (%a)')
+            date_display = format_publish_date(email['publish_date'])
             print(f"  {i + 1}. {date_display} - {email['subject']}")
         print("-" * 30)
 
@@ -87,10 +158,8 @@ def format_for_linkedin(subject, description, html_body, url):
 
     footnotes = []
     def link_to_footnote(match):
-        link_text = match.group(1)
-        link_url = match.group(2)
-        footnotes.append(link_url)
-        return f"{link_text} [{len(footnotes)}]"
+        footnotes.append(match.group(2))
+        return f"{match.group(1)} [{len(footnotes)}]"
 
     def convert_md_table_to_list(match):
         table_text = match.group(0)
@@ -101,45 +170,50 @@ def format_for_linkedin(subject, description, html_body, url):
         for row in lines[2:]:
             columns = [col.strip() for col in row.split('|') if col.strip()]
             if len(columns) >= 3:
-                symbol_match = re.search(r'\[(.*?)\]', columns[0])
+                symbol_match = SYMBOL_RE.search(columns[0])
                 symbol = symbol_match.group(1) if symbol_match else columns[0]
                 company = columns[1]
                 change = columns[2]
                 list_items.append(f"• {symbol} ({company}): {change}")
         return "\n".join(list_items)
 
-    text = md(html_body, heading_style="ATX")
+    # Skip markdownify's per-text-node escaping; the replaces below only need to
+    # undo backslash escapes already present in markdown-authored bodies.
+    text = md(
+        html_body,
+        heading_style="ATX",
+        escape_asterisks=False,
+        escape_underscores=False,
+        escape_misc=False,
+    )
 
     text = text.replace('\\*', '*')
     text = text.replace('\\$', '$')
     text = text.replace('\\_', '_')
     
-    text = re.sub(r'\{\{.*?\}\}', '', text, flags=re.IGNORECASE)
-    text = re.sub(r'^(https?://[^\s]+)\s*$', '', text, flags=re.MULTILINE)
-    text = re.sub(r'^\s*---\s*$', '', text, flags=re.MULTILINE)
-    text = re.sub(r'```[\s\S]*?```', '', text)
+    # Separate passes, in this order: removing a tag can leave a bare URL or '---'
+    # alone on its line, and the later passes then delete it.
+    text = TEMPLATE_RE.sub('', text)
+    text = BARE_URL_RE.sub('', text)
+    text = HR_RE.sub('', text)
+    text = CODE_FENCE_RE.sub('', text)
     
-    table_pattern = re.compile(r'^\s*\|.*\|.*\n\s*\|[-|: ]+\|.*\n((?:\s*\|.*\|.*\n?)+)', re.MULTILINE)
-    text = table_pattern.sub(convert_md_table_to_list, text)
+    text = TABLE_RE.sub(convert_md_table_to_list, text)
     
-    text = re.sub(r'\*\s*\[.*?\]\(.*?\)\s*\((.*?)\):\s*\*\*(.*?)\*\*', r'• \1: \2', text)
-    text = re.sub(r'\[(.*?)\]\((.*?)\)', link_to_footnote, text)
+    text = TICKER_RE.sub(r'• \1: \2', text)
+    text = LINK_RE.sub(link_to_footnote, text)
     
-    text = re.sub(r'#+\s*📈\s*Markets Monday.*', '📈 Markets Monday', text, flags=re.IGNORECASE)
-    text = re.sub(r'#+\s*🔥\s*Hot Takes Tuesday.*', '🔥 Hot Takes Tuesday', text, flags=re.IGNORECASE)
-    text = re.sub(r'#+\s*🤪\s*Wacky Wednesday.*', '🤪 Wacky Wednesday', text, flags=re.IGNORECASE)
-    text = re.sub(r'#+\s*🔙\s*Throwback Thursday.*', '🔙 Throwback Thursday', text, flags=re.IGNORECASE)
-    text = re.sub(r'#+\s*✅\s*Final Thoughts Friday.*', '✅ Final Thoughts Friday', text, flags=re.IGNORECASE)
-    text = re.sub(r'#+\s*🔮\s*Sneak Peak Saturday.*', '🔮 Sneak Peak Saturday', text, flags=re.IGNORECASE)
+    text = DAY_RE.sub(lambda m: DAY_HEADERS[m.group(1).lower()], text)
     
-    text = re.sub(r'^#+\s*(.+)$', r'\n\n\1\n', text, flags=re.MULTILINE)
+    text = HEADING_RE.sub(r'\n\n\1\n', text)
     
-    text = re.sub(r'([\.!\?])\s*([A-Z])', r'\1\n\n\2', text)
+    text = SENTENCE_RE.sub(r'\1\n\n\2', text)
 
-    text = re.sub(r'(\*\*|__)', '', text)
-    text = re.sub(r'^\s*[\*\-]\s*', '• ', text, flags=re.MULTILINE)
-    text = re.sub(r'#+\s*', '', text)
-    text = re.sub(r'\n{3,}', '\n\n', text).strip()
+    # Bold markers are fixed literals, so plain str.replace beats the regex engine.
+    text = text.replace('**', '').replace('__', '')
+    text = LIST_RE.sub('• ', text)
+    text = STRAY_HASH_RE.sub('', text)
+    text = BLANKS_RE.sub('\n\n', text).strip()
 
     footnote_section = ""
     if footnotes:
@@ -174,7 +248,7 @@ def post_to_linkedin(post_content):
         }
     }
     try:
-        response = requests.post("https://api.linkedin.com/v2/ugcPosts", headers=headers, json=post_data)
+        response = SESSION.post("https://api.linkedin.com/v2/ugcPosts", headers=headers, data=json_dumps(post_data))
         response.raise_for_status()
         print("\n✅ Successfully posted to LinkedIn!")
     except requests.exceptions.RequestException as e:
@@ -200,6 +274,8 @@ def is_emoji(char):
     return False
 
 # --- REVISED FUNCTION ---
+# Cached: the recursive glob over every font dir only needs to run once per pattern.
+@functools.lru_cache(maxsize=None)
 def find_font(glob_pattern, name_for_log=""):
     """
     Finds a single font file matching a glob pattern across common system dirs.
@@ -263,6 +339,11 @@ def find_font(glob_pattern, name_for_log=""):
     print(f"⚠️  WARNING: Could not find any {name_for_log} font for pattern '{glob_pattern}'")
     return None
 
+@functools.lru_cache(maxsize=16)
+def load_font(font_path, size, index=0):
+    """Loads (and caches) a FreeType font so each (path, size) is only opened once."""
+    return ImageFont.truetype(font_path, size=size, index=index)
+
 # --- REVISED FUNCTION ---
 def draw_text_with_fallback(draw, xy, text, fill, text_font, emoji_font_path, font_size):
     """
@@ -283,13 +364,13 @@ def draw_text_with_fallback(draw, xy, text, fill, text_font, emoji_font_path, fo
                 try:
                     # --- THIS IS THE FIX (Step 1) ---
                     # First, try to load at the *exact* calculated size
-                    emoji_font_instance = ImageFont.truetype(emoji_font_path, size=font_size, index=font_index)
+                    emoji_font_instance = load_font(emoji_font_path, font_size, font_index)
                 except (IOError, OSError) as e:
                     # --- THIS IS THE FIX (Step 2) ---
                     # If that fails, try the 'known-good' 96
                     if "invalid pixel size" in str(e):
                         try:
-                            emoji_font_instance = ImageFont.truetype(emoji_font_path, size=96, index=font_index)
+                            emoji_font_instance = load_font(emoji_font_path, 96, font_index)
                         except (IOError, OSError) as e2:
                             print(f"--- DEBUG: Failed to load emoji font at size {font_size} AND 96: {e2} ---")
                             emoji_font_instance = text_font # Give up
@@ -310,6 +391,13 @@ def draw_text_with_fallback(draw, xy, text, fill, text_font, emoji_font_path, fo
             bbox = font_to_use.getbbox(char)
             current_x += bbox[2] - bbox[0]
 
+# --- GIF Cache ---
+# The scrolling GIF is a pure function of the title and render settings, so a rerun
+# for the same subject copies the previous render instead of drawing it again.
+# Bump GIF_CACHE_VERSION whenever the rendering changes to invalidate old entries.
+GIF_CACHE_VERSION = "1"
+GIF_CACHE_DIR = Path(".gif_cache")
+
 # --- REVISED FUNCTION ---
 def create_scrolling_gif(
     text,
@@ -321,8 +409,19 @@ def create_scrolling_gif(
 ):
     """
     Generates an animated GIF with scrolling text, using separate fonts
-    for text and emoji.
+    for text and emoji. Renders are cached on disk by a hash of the inputs.
     """
+    cache_key = hashlib.sha1(
+        repr((GIF_CACHE_VERSION, text, width, height, bg_color, text_color)).encode("utf-8")
+    ).hexdigest()
+    cached_gif = GIF_CACHE_DIR / f"{cache_key}.gif"
+    if cached_gif.exists():
+        try:
+            shutil.copyfile(cached_gif, output_filename)
+            print(f"✅ Reused cached GIF as '{output_filename}'")
+            return output_filename
+        except OSError as e:
+            print(f"⚠️ Could not reuse cached GIF {cached_gif}: {e}")
     
     # --- 1. Setup Fonts (REVISED) ---
     font_size = int(height * 0.15) # This will be ~94
@@ -342,7 +441,7 @@ def create_scrolling_gif(
     # We ONLY load the text_font here.
     try:
         if text_font_path:
-            text_font = ImageFont.truetype(text_font_path, size=font_size)
+            text_font = load_font(text_font_path, font_size)
         else:
             print("Falling back to default font for TEXT")
             text_font = ImageFont.load_default()
@@ -376,12 +475,12 @@ def create_scrolling_gif(
                     font_index = 0 if emoji_font_path.endswith(".ttc") else 0
                     try:
                         # --- THIS IS THE FIX (Step 1) ---
-                        temp_emoji_font = ImageFont.truetype(emoji_font_path, size=font_size, index=font_index)
+                        temp_emoji_font = load_font(emoji_font_path, font_size, font_index)
                     except (IOError, OSError) as e:
                         # --- THIS IS THE FIX (Step 2) ---
                         if "invalid pixel size" in str(e):
                             try:
-                                temp_emoji_font = ImageFont.truetype(emoji_font_path, size=96, index=font_index)
+                                temp_emoji_font = load_font(emoji_font_path, 96, font_index)
                             except (IOError, OSError) as e2:
                                 print(f"--- DEBUG (Calc): Failed to load emoji font at size {font_size} AND 96: {e2} ---")
                                 temp_emoji_font = text_font # Give up
@@ -415,40 +514,48 @@ def create_scrolling_gif(
         return None
         
     num_frames = total_scroll_width // scroll_speed
-    frames = []
 
     # --- 4. Generate Frames ---
+    # Rasterize the text once onto a wide strip (two copies, one scroll-width apart)
+    # and cut each frame out of it, instead of re-drawing every glyph per frame.
+    strip = Image.new('RGB', (total_scroll_width + width, height), color=bg_color)
+    d = ImageDraw.Draw(strip)
+    draw_text_with_fallback(d, (0, y_pos), text, text_color, text_font, emoji_font_path, font_size)
+    draw_text_with_fallback(d, (total_scroll_width, y_pos), text, text_color, text_font, emoji_font_path, font_size)
+
+    # Quantize once to a shared palette so every frame is already 'P' mode (1 byte/pixel)
+    # and the GIF encoder doesn't have to re-quantize each RGB frame on save.
+    strip = strip.convert('P', palette=Image.Palette.ADAPTIVE, colors=256)
+
+    def frame_at(i):
+        return strip.crop((i * scroll_speed, 0, i * scroll_speed + width, height))
+
     print(f"Generating {num_frames} frames for animation...")
-    for i in range(num_frames):
-        img = Image.new('RGB', (width, height), color=bg_color)
-        d = ImageDraw.Draw(img)
-        
-        current_x_pos = -(i * scroll_speed)
-        
-        # Pass font_size to the helper
-        draw_text_with_fallback(d, (current_x_pos, y_pos), text, text_color, text_font, emoji_font_path, font_size)
-        
-        # Draw the "next" text that follows it
-        draw_text_with_fallback(d, (current_x_pos + total_scroll_width, y_pos), text, text_color, text_font, emoji_font_path, font_size)
-        
-        frames.append(img)
     
     # --- 5. Save the GIF ---
     try:
-        frames[0].save(
+        # Frames are cut lazily as the encoder asks for them, so we never hold
+        # a second full list of frames alongside the encoder's own copies.
+        frame_at(0).save(
             output_filename,
             save_all=True,
-            append_images=frames[1:],
+            append_images=(frame_at(i) for i in range(1, num_frames)),
             duration=frame_duration_ms,
             loop=0, # 0 = loop forever
-            optimize=True
+            optimize=False # Frames already share one palette; the extra pass buys nothing
         )
         print(f"✅ GIF saved as '{output_filename}'")
-        return output_filename
     except Exception as e:
         print(f"❌ Error saving GIF: {e}")
         return None
 
+    try:
+        GIF_CACHE_DIR.mkdir(exist_ok=True)
+        shutil.copyfile(output_filename, cached_gif)
+    except OSError as e:
+        print(f"⚠️ Could not write GIF cache file {cached_gif}: {e}")
+    return output_filename
+
 # --- NEW ---
 def post_to_linkedin_with_media(post_content, media_filename, subject):
     """
@@ -479,13 +586,13 @@ def post_to_linkedin_with_media(post_content, media_filename, subject):
     }
     
     try:
-        r_register = requests.post(
+        r_register = SESSION.post(
             "https://api.linkedin.com/v2/assets?action=registerUpload",
             headers=register_headers,
-            json=register_data
+            data=json_dumps(register_data)
         )
         r_register.raise_for_status()
-        register_response = r_register.json()
+        register_response = json_loads(r_register.content)
         
         upload_url = register_response["value"]["uploadMechanism"]["com.linkedin.digitalmedia.uploading.MediaUploadHttpRequest"]["uploadUrl"]
         asset_urn = register_response["value"]["asset"]
@@ -509,14 +616,13 @@ def post_to_linkedin_with_media(post_content, media_filename, subject):
     }
     
     try:
+        # Stream the file straight from disk rather than reading it into memory first.
         with open(media_filename, 'rb') as f:
-            media_data = f.read()
-            
-        r_upload = requests.put(
-            upload_url,
-            headers=upload_headers,
-            data=media_data
-        )
+            r_upload = SESSION.put(
+                upload_url,
+                headers=upload_headers,
+                data=f
+            )
         r_upload.raise_for_status()
         print("  ✅ Media file uploaded successfully.")
         
@@ -556,7 +662,7 @@ def post_to_linkedin_with_media(post_content, media_filename, subject):
     }
 
     try:
-        r_post = requests.post("https://api.linkedin.com/v2/ugcPosts", headers=post_headers, json=post_data)
+        r_post = SESSION.post("https://api.linkedin.com/v2/ugcPosts", headers=post_headers, data=json_dumps(post_data))
         r_post.raise_for_status()
         print("\n✅ Successfully posted to LinkedIn with media!")
     except requests.exceptions.RequestException as e:
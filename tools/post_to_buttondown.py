@@ -38,13 +38,13 @@ def find_recent_markdown_files(directory_path, days=7):
             try:
                 modified_time = datetime.fromtimestamp(file_path.stat().st_mtime)
                 if modified_time > time_threshold:
-                    recent_files.append(file_path)
+                    recent_files.append((modified_time, file_path))
             except FileNotFoundError:
                 continue
 
-    # Sort files by modification time, newest first
-    recent_files.sort(key=lambda p: p.stat().st_mtime, reverse=True)
-    return recent_files
+    # Sort files by modification time, newest first, on the mtime read above (no second stat)
+    recent_files.sort(key=lambda item: item[0], reverse=True)
+    return [file_path for _, file_path in recent_files]
 
 
 def post_to_buttondown(file_path):
@@ -1,5 +1,13 @@
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 import json
+try:
+    # orjson serializes request payloads in C; fall back to the stdlib if absent.
+    import orjson
+    json_dumps = orjson.dumps
+except ImportError:
+    json_dumps = lambda obj: json.dumps(obj).encode("utf-8")
 from dotenv import load_dotenv
 import os
 from datetime import datetime, timedelta, timezone
@@ -14,6 +22,22 @@ BUTTONDOWN_API_KEY = os.getenv("BUTTONDOWN_API_KEY")
 GOTOSOCIAL_INSTANCE_URL = os.getenv("GOTOSOCIAL_INSTANCE_URL")
 GOTOSOCIAL_ACCESS_TOKEN = os.getenv("GOTOSOCIAL_ACCESS_TOKEN")
 
+# One pooled session for the Buttondown and GoToSocial calls so repeat requests
+# to a host reuse the same TCP+TLS connection instead of handshaking each time.
+SESSION = requests.Session()
+SESSION.mount("https://", HTTPAdapter(
+    pool_connections=4,
+    pool_maxsize=4,
+    max_retries=Retry(total=3, backoff_factor=0.3, status_forcelist=(429, 500, 502, 503, 504)),
+))
+
+# --- Precompiled Formatting Patterns ---
+# Compiled once at import so format_for_gotosocial doesn't re-resolve patterns per call.
+ESCAPE_RE = re.compile(r'\\([*_])')
+CODE_FENCE_RE = re.compile(r'```[\s\S]*?```')
+HEADING_MARK_RE = re.compile(r'^#+\s*', re.MULTILINE) # Only hashes at the start of a line
+BLANKS_RE = re.compile(r'\n{3,}')
+
 # --- Verification ---
 if not all([BUTTONDOWN_API_KEY, GOTOSOCIAL_INSTANCE_URL, GOTOSOCIAL_ACCESS_TOKEN]):
     raise ValueError("One or more required environment variables are missing in your .env file.")
@@ -32,7 +56,7 @@ def get_weekly_emails_and_prompt():
 
     try:
         print(f"▶️ Fetching emails since {start_date_str} from Buttondown...")
-        response = requests.get(url, headers=headers)
+        response = SESSION.get(url, headers=headers)
         response.raise_for_status()
         emails = response.json().get("results", [])
 
@@ -72,12 +96,11 @@ def format_for_gotosocial(subject, html_body, url):
     text = md(html_body, heading_style="ATX")
 
     # General cleanup
-    text = text.replace('\\*', '*')
-    text = text.replace('\\_', '_')
-    text = re.sub(r'```[\s\S]*?```', '', text) # Remove code blocks
+    text = ESCAPE_RE.sub(r'\1', text) # Unescape \* and \_ in one pass
+    text = CODE_FENCE_RE.sub('', text) # Remove code blocks
     # --- FIXED REGEX --- Only removes hashes at the start of a line
-    text = re.sub(r'^#+\s*', '', text, flags=re.MULTILINE) 
-    text = re.sub(r'\n{3,}', '\n\n', text).strip()
+    text = HEADING_MARK_RE.sub('', text)
+    text = BLANKS_RE.sub('\n\n', text).strip()
 
     # Construct the post
     full_post = f"{subject}\n\n{text}\n\nRead the full post here: {url}"
@@ -100,7 +123,7 @@ def post_to_gotosocial(post_content):
     }
 
     try:
-        response = requests.post(post_url, headers=headers, json=post_data)
+        response = SESSION.post(post_url, headers=headers, data=json_dumps(post_data))
         response.raise_for_status()
         print("\n✅ Successfully posted to GoToSocial!")
     except requests.exceptions.RequestException as e:
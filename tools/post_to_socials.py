@@ -61,12 +61,13 @@ def find_recent_markdown_files(directory_path, days=7):
         try:
             modified_time = datetime.fromtimestamp(file_path.stat().st_mtime)
             if modified_time > time_threshold:
-                recent_files.append(file_path)
+                recent_files.append((modified_time, file_path))
         except FileNotFoundError:
             continue
 
-    recent_files.sort(key=lambda p: p.stat().st_mtime, reverse=True)
-    return recent_files
+    # Newest first, sorted on the mtime read above instead of stat()ing every file again
+    recent_files.sort(key=lambda item: item[0], reverse=True)
+    return [file_path for _, file_path in recent_files]
 
 def check_url_status(url):
     """Checks if a URL is live and returns a 200 status code."""